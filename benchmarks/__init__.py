@@ -0,0 +1 @@
+"""Benchmark suite, see benchmarks/run.py"""
@@ -0,0 +1,96 @@
+"""
+Benchmark: GET /products listing, ORM hydration vs row projection
+
+Compares the old path (Product ORM objects -> to_dict, kept here as the
+baseline) with ProductService.get_products, which serializes column tuples
+(Product.row_columns -> Product.row_to_dict). Both end in jsonify like the
+real route.
+
+Run from the repo root:
+    python -m benchmarks.bench_product_listing --products 5000 --per-page 100
+"""
+import argparse
+import statistics
+import time
+from flask import jsonify
+from src.app import create_app
+from src.database import db
+from src.models.product import Product
+from src.models.user import User
+from src.repositories.product_repository import ProductRepository
+from src.services.product_service import ProductService
+
+
+def seed(product_count):
+    admin = User(username='bench_admin', email='bench@example.com', password_hash='x', role='admin')
+    db.session.add(admin)
+    db.session.flush()
+    
+    rows = [
+        {
+            'name': f'Product {i}',
+            'description': f'Benchmark product number {i} ' + 'lorem ipsum ' * 20,
+            'price': 1 + i % 500,
+            'stock': i % 50,
+            'category': f'category-{i % 12}',
+            'image_url': None
+        }
+        for i in range(product_count)
+    ]
+    for start in range(0, len(rows), 1000):
+        ProductRepository.bulk_save(rows[start:start + 1000], admin.id)
+    db.session.commit()
+
+
+def orm_path(page, per_page):
+    pagination = (
+        Product.query
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+    return jsonify({
+        'products': [p.to_dict() for p in pagination.items],
+        'total': pagination.total
+    })
+
+
+def row_path(page, per_page):
+    result, error = ProductService.get_products(page=page, per_page=per_page)
+    return jsonify(result)
+
+
+def measure(fn, iterations, per_page, pages):
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(page=1 + i % pages, per_page=per_page)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()  # every request starts with an empty identity map
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    with app.test_request_context():
+        seed(args.products)
+        pages = max(1, args.products // args.per_page)
+        
+        results = {}
+        for name, fn in (('orm', orm_path), ('rows', row_path)):
+            measure(fn, 10, args.per_page, pages)  # warm up
+            timings = measure(fn, args.iterations, args.per_page, pages)
+            results[name] = statistics.median(timings)
+            print(f"{name:>5}: median {results[name]:.2f} ms  "
+                  f"p95 {statistics.quantiles(timings, n=20)[-1]:.2f} ms")
+        
+        print(f"speedup: {results['orm'] / results['rows']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files from benchmarks/run.py --output
+
+    python -m benchmarks.compare before.json after.json
+
+Negative latency change / positive throughput change = faster.
+"""
+import argparse
+import json
+import sys
+
+COLUMNS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')
+
+
+def change(old, new):
+    if not old:
+        return '     n/a'
+    return f'{(new - old) / old * 100:+7.1f}%'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Diff two benchmark JSON reports')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+    
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    
+    if before['meta']['dataset'] != after['meta']['dataset']:
+        print('warning: the runs used different datasets', file=sys.stderr)
+    
+    print(f"{before['meta'].get('revision')} -> {after['meta'].get('revision')}")
+    print(f"{'scenario':<40} " + ' '.join(f'{column:>16}' for column in COLUMNS))
+    
+    for name in sorted(set(before['scenarios']) | set(after['scenarios'])):
+        old = before['scenarios'].get(name)
+        new = after['scenarios'].get(name)
+        if not old or not new:
+            print(f"{name:<40} {'only in ' + ('after' if new else 'before'):>16}")
+            continue
+        cells = (f'{new[column]:>8} {change(old[column], new[column])}' for column in COLUMNS)
+        print(f'{name:<40} ' + ' '.join(cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Deterministic synthetic data for benchmarks
+
+Same arguments + same seed = same rows (IDs, names, prices, timestamps),
+so runs on different versions measure the same workload.
+"""
+import random
+from datetime import datetime, timedelta
+from src.database import db
+from src.models.basket import Basket, BasketItem
+from src.models.product import Product
+from src.models.user import User
+from src.repositories.order_repository import OrderRepository
+from src.repositories.product_repository import ProductRepository
+from src.utils.password_hasher import get_password_hasher
+
+PASSWORD = 'Bench-pass-123'
+ADMIN_USERNAME = 'bench_admin'
+
+# Fixed clock so created_at/completed_at don't depend on when the run started
+EPOCH = datetime(2024, 1, 1)
+
+_WORDS = (
+    'wireless', 'organic', 'compact', 'premium', 'classic', 'smart', 'portable',
+    'vintage', 'ultra', 'eco', 'deluxe', 'mini', 'pro', 'travel', 'kitchen',
+    'garden', 'studio', 'outdoor', 'cotton', 'steel', 'ceramic', 'bamboo'
+)
+_NOUNS = (
+    'headphones', 'kettle', 'backpack', 'lamp', 'blender', 'jacket', 'mug',
+    'speaker', 'notebook', 'chair', 'bottle', 'camera', 'watch', 'pillow'
+)
+
+
+class Dataset:
+    """IDs and credentials of the generated data"""
+    
+    def __init__(self, admin_username, usernames, product_ids, categories, order_ids):
+        self.admin_username = admin_username
+        self.usernames = usernames
+        self.product_ids = product_ids
+        self.categories = categories
+        self.order_ids = order_ids  # username -> [order IDs]
+        self.password = PASSWORD
+
+
+def generate(users=50, products=2000, categories=12, orders_per_user=5,
+             items_per_basket=5, seed=42, chunk_size=1000):
+    """
+    Populate an empty database (call inside app context)
+    
+    Creates an admin, `users` shoppers each with an active basket of
+    `items_per_basket` lines, `orders_per_user` completed orders per user,
+    and `products` products spread across `categories` categories.
+    
+    Returns:
+        Dataset
+    """
+    rng = random.Random(seed)
+    
+    # One bcrypt hash shared by every account keeps seeding fast
+    password_hash = get_password_hasher().hash(PASSWORD)
+    
+    admin = User(username=ADMIN_USERNAME, email='bench_admin@example.com',
+                 password_hash=password_hash, role='admin', created_at=EPOCH)
+    db.session.add(admin)
+    
+    shoppers = [
+        User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com',
+             password_hash=password_hash, created_at=EPOCH)
+        for i in range(users)
+    ]
+    db.session.add_all(shoppers)
+    db.session.flush()
+    
+    category_names = [f'category-{i:02d}' for i in range(categories)]
+    rows = []
+    for i in range(products):
+        name = f'{rng.choice(_WORDS).title()} {rng.choice(_WORDS)} {rng.choice(_NOUNS)} {i}'
+        rows.append({
+            'name': name,
+            'description': f'{name} - ' + ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(8, 30))),
+            'price': round(rng.uniform(1, 500), 2),
+            'stock': rng.randint(1000, 5000),  # checkout scenarios must not run out
+            'category': rng.choice(category_names),
+            'image_url': None,
+            'created_at': EPOCH + timedelta(minutes=i),
+            'updated_at': EPOCH + timedelta(minutes=i)
+        })
+    for start in range(0, len(rows), chunk_size):
+        ProductRepository.bulk_save(rows[start:start + chunk_size], admin.id)
+    db.session.flush()
+    
+    catalog = {product.id: product for product in Product.query.order_by(Product.id)}
+    product_ids = list(catalog)
+    
+    order_ids = {}
+    for user_number, user in enumerate(shoppers):
+        order_ids[user.username] = []
+        
+        for order_number in range(orders_per_user):
+            created_at = EPOCH + timedelta(days=user_number, hours=order_number)
+            basket = Basket(user_id=user.id, status='completed', created_at=created_at, updated_at=created_at)
+            basket.items = _random_items(rng, catalog, product_ids, items_per_basket, created_at)
+            db.session.add(basket)
+            db.session.flush()
+            OrderRepository.create_from_basket(basket, completed_at=created_at + timedelta(minutes=30))
+            # As at checkout, the order snapshot replaces the basket lines
+            basket.items.clear()
+            order_ids[user.username].append(basket.id)
+        
+        created_at = EPOCH + timedelta(days=user_number, hours=orders_per_user)
+        basket = Basket(user_id=user.id, status='active', created_at=created_at, updated_at=created_at)
+        basket.items = _random_items(rng, catalog, product_ids, items_per_basket, created_at)
+        db.session.add(basket)
+    
+    db.session.commit()
+    
+    return Dataset(
+        admin_username=ADMIN_USERNAME,
+        usernames=[user.username for user in shoppers],
+        product_ids=product_ids,
+        categories=category_names,
+        order_ids=order_ids
+    )
+
+
+def _random_items(rng, catalog, product_ids, count, added_at):
+    items = []
+    for product_id in rng.sample(product_ids, min(count, len(product_ids))):
+        item = BasketItem(product_id=product_id, quantity=rng.randint(1, 3), added_at=added_at)
+        item.product = catalog[product_id]
+        items.append(item)
+    return items
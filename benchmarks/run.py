@@ -0,0 +1,312 @@
+"""
+Benchmark every auth, product and basket route through the Flask test client
+
+Seeds a deterministic dataset (benchmarks/datagen.py), runs each scenario
+N times and reports p50/p95/p99 latency and throughput. Use --output to
+save JSON and benchmarks/compare.py to diff two runs.
+
+Run from the repo root:
+    python -m benchmarks.run --products 5000 --iterations 200 --output before.json
+    python -m benchmarks.run --only basket.
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from importlib.metadata import version
+from src.app import create_app
+from src.config import TestingConfig, config
+from src.models.user import User
+from benchmarks import datagen
+
+
+class Scenario:
+    """
+    One timed request shape
+    
+    Args:
+        name: Report key ("<blueprint>.<view>" plus a variant)
+        build: fn(ctx, i, prepared) -> kwargs for client.open
+        prepare: Optional fn(ctx, i), run untimed before each request
+        expect: Accepted status codes, anything else counts as an error
+        weight: Fraction of --iterations to run (expensive scenarios)
+    """
+    
+    def __init__(self, name, build, prepare=None, expect=(200,), weight=1.0):
+        self.name = name
+        self.build = build
+        self.prepare = prepare
+        self.expect = expect
+        self.weight = weight
+
+
+class Context:
+    """Shared state for scenarios: client, dataset and cached tokens"""
+    
+    def __init__(self, client, dataset):
+        self.client = client
+        self.dataset = dataset
+        self._tokens = {}
+    
+    def token(self, username):
+        if username not in self._tokens:
+            response = self.client.post('/auth/login', json={
+                'username': username, 'password': self.dataset.password
+            })
+            self._tokens[username] = response.get_json()['data']['access_token']
+        return self._tokens[username]
+    
+    def auth(self, username):
+        return {'Authorization': f'Bearer {self.token(username)}'}
+    
+    def user(self, i):
+        return self.dataset.usernames[i % len(self.dataset.usernames)]
+    
+    def admin(self):
+        return self.auth(self.dataset.admin_username)
+    
+    def product_id(self, i):
+        # Stride through the catalog so consecutive iterations touch different rows
+        ids = self.dataset.product_ids
+        return ids[(i * 7919) % len(ids)]
+    
+    def add_to_basket(self, username, product_id, quantity=1):
+        self.client.post('/basket/add', headers=self.auth(username),
+                         json={'product_id': product_id, 'quantity': quantity})
+    
+    def create_product(self, i):
+        response = self.client.post('/products', headers=self.admin(), json=_product_payload(f'Bench temp {i}'))
+        return response.get_json()['data']['product']['id']
+
+
+def _product_payload(name):
+    return {
+        'name': name,
+        'description': 'Created by the benchmark suite',
+        'price': 19.99,
+        'stock': 100,
+        'category': 'category-00'
+    }
+
+
+def _import_body(i, rows=100):
+    lines = ['name,description,price,stock,category,image_url']
+    lines += [f'Bench import {n},Imported by the benchmark suite,{n % 90 + 10},{n % 40},category-01,'
+              for n in range(rows)]
+    return '\n'.join(lines).encode()
+
+
+def _etag(ctx, path):
+    return ctx.client.get(path).headers.get('ETag')
+
+
+def build_scenarios():
+    s = Scenario
+    return [
+        # --- auth ---
+        s('auth.login', lambda ctx, i, _: dict(
+            method='POST', path='/auth/login',
+            json={'username': ctx.user(i), 'password': ctx.dataset.password})),
+        s('auth.me', lambda ctx, i, _: dict(method='GET', path='/auth/me', headers=ctx.auth(ctx.user(i)))),
+        s('auth.signup', lambda ctx, i, _: dict(
+            method='POST', path='/auth/signup',
+            json={'username': f'bench_signup_{i}', 'email': f'bench_signup_{i}@example.com',
+                  'password': ctx.dataset.password}),
+          expect=(201,)),
+        
+        # --- products (reads) ---
+        s('products.get_products', lambda ctx, i, _: dict(method='GET', path=f'/products?page={i % 20 + 1}&per_page=20')),
+        s('products.get_products[category]', lambda ctx, i, _: dict(
+            method='GET', path=f'/products?category={ctx.dataset.categories[i % len(ctx.dataset.categories)]}&per_page=20')),
+        s('products.get_products[search]', lambda ctx, i, _: dict(
+            method='GET', path=f'/products?search={datagen._NOUNS[i % len(datagen._NOUNS)]}&per_page=20')),
+        s('products.get_products[cursor]', lambda ctx, i, _: dict(method='GET', path='/products?cursor=&per_page=20')),
+        s('products.get_products[304]', lambda ctx, i, etag: dict(
+            method='GET', path='/products?per_page=20', headers={'If-None-Match': etag}),
+          prepare=lambda ctx, i: _etag(ctx, '/products?per_page=20'), expect=(304,)),
+        s('products.get_product', lambda ctx, i, _: dict(method='GET', path=f'/products/{ctx.product_id(i)}')),
+        s('products.get_categories', lambda ctx, i, _: dict(method='GET', path='/products/categories')),
+        s('products.get_categories[with_counts]', lambda ctx, i, _: dict(
+            method='GET', path='/products/categories?with_counts=1')),
+        s('products.export_products', lambda ctx, i, _: dict(
+            method='GET', path='/products/export', headers=ctx.admin()), weight=0.1),
+        
+        # --- products (writes, admin) ---
+        s('products.create_product', lambda ctx, i, _: dict(
+            method='POST', path='/products', headers=ctx.admin(), json=_product_payload(f'Bench product {i}')),
+          expect=(201,)),
+        s('products.update_product', lambda ctx, i, _: dict(
+            method='PUT', path=f'/products/{ctx.product_id(i)}', headers=ctx.admin(), json={'stock': 1000 + i})),
+        s('products.delete_product', lambda ctx, i, product_id: dict(
+            method='DELETE', path=f'/products/{product_id}', headers=ctx.admin()),
+          prepare=lambda ctx, i: ctx.create_product(i)),
+        s('products.import_products', lambda ctx, i, _: dict(
+            method='POST', path='/products/import?format=csv&mode=upsert', headers=ctx.admin(),
+            data=_import_body(i), content_type='text/csv'), weight=0.1),
+        
+        # --- basket ---
+        s('basket.get_basket', lambda ctx, i, _: dict(method='GET', path='/basket', headers=ctx.auth(ctx.user(i)))),
+        s('basket.add_to_basket', lambda ctx, i, _: dict(
+            method='POST', path='/basket/add', headers=ctx.auth(ctx.user(i)),
+            json={'product_id': ctx.product_id(i), 'quantity': 1})),
+        s('basket.update_basket_item', lambda ctx, i, _: dict(
+            method='PUT', path='/basket/update', headers=ctx.auth(ctx.user(i)),
+            json={'product_id': ctx.product_id(i), 'quantity': 2}),
+          prepare=lambda ctx, i: ctx.add_to_basket(ctx.user(i), ctx.product_id(i))),
+        s('basket.remove_from_basket', lambda ctx, i, _: dict(
+            method='DELETE', path=f'/basket/remove/{ctx.product_id(i)}', headers=ctx.auth(ctx.user(i))),
+          prepare=lambda ctx, i: ctx.add_to_basket(ctx.user(i), ctx.product_id(i))),
+        s('basket.batch_basket_items', lambda ctx, i, _: dict(
+            method='POST', path='/basket/items:batch', headers=ctx.auth(ctx.user(i)),
+            json={'operations': [
+                {'product_id': ctx.product_id(i + n), 'quantity': 1, 'op': 'add'} for n in range(10)
+            ]})),
+        s('basket.checkout', lambda ctx, i, _: dict(method='POST', path='/basket/checkout', headers=ctx.auth(ctx.user(i))),
+          prepare=lambda ctx, i: ctx.add_to_basket(ctx.user(i), ctx.product_id(i))),
+        s('basket.clear_basket', lambda ctx, i, _: dict(method='DELETE', path='/basket/clear', headers=ctx.auth(ctx.user(i))),
+          prepare=lambda ctx, i: ctx.add_to_basket(ctx.user(i), ctx.product_id(i))),
+        s('basket.get_order_history', lambda ctx, i, _: dict(
+            method='GET', path='/basket/orders?per_page=20', headers=ctx.auth(ctx.user(i)))),
+        s('basket.get_order', lambda ctx, i, order_id: dict(
+            method='GET', path=f'/basket/orders/{order_id}', headers=ctx.auth(ctx.user(i))),
+          prepare=lambda ctx, i: ctx.dataset.order_ids[ctx.user(i)][i % len(ctx.dataset.order_ids[ctx.user(i)])]),
+    ]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(ctx, scenario, iterations, warmup):
+    timings = []
+    errors = 0
+    
+    for i in range(warmup + iterations):
+        prepared = scenario.prepare(ctx, i) if scenario.prepare else None
+        request = scenario.build(ctx, i, prepared)
+        
+        started = time.perf_counter()
+        response = ctx.client.open(**request)
+        response.get_data()  # drain streamed bodies (export)
+        elapsed = time.perf_counter() - started
+        
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        if response.status_code not in scenario.expect:
+            errors += 1
+    
+    timings.sort()
+    total = sum(timings)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'iterations': len(timings),
+        'errors': errors,
+        'p50_ms': ms(percentile(timings, 50)),
+        'p95_ms': ms(percentile(timings, 95)),
+        'p99_ms': ms(percentile(timings, 99)),
+        'mean_ms': ms(total / len(timings)) if timings else 0.0,
+        'max_ms': ms(timings[-1]) if timings else 0.0,
+        'throughput_rps': round(len(timings) / total, 1) if total else 0.0
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_app(database_url=None):
+    if not database_url:
+        return create_app('testing')
+    
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+    
+    config['benchmark'] = BenchmarkConfig
+    return create_app('benchmark')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark API routes with a seeded dataset')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--orders-per-user', type=int, default=5)
+    parser.add_argument('--items-per-basket', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='Run scenarios whose name starts with this prefix')
+    parser.add_argument('--database-url', help='Empty database to use instead of in-memory SQLite')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+    
+    # TestingConfig's short JWT secret warns on every token
+    warnings.filterwarnings('ignore', message='The HMAC key')
+    
+    app = make_app(args.database_url)
+    with app.app_context():
+        if User.query.first() is not None:
+            parser.error('the database is not empty')
+        dataset = datagen.generate(
+            users=args.users, products=args.products, categories=args.categories,
+            orders_per_user=args.orders_per_user, items_per_basket=args.items_per_basket,
+            seed=args.seed
+        )
+    
+    ctx = Context(app.test_client(), dataset)
+    scenarios = [s for s in build_scenarios() if not args.only or s.name.startswith(args.only)]
+    
+    results = {}
+    print(f"{'scenario':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for scenario in scenarios:
+        iterations = max(1, int(args.iterations * scenario.weight))
+        result = results[scenario.name] = run_scenario(ctx, scenario, iterations, args.warmup)
+        print(f"{scenario.name:<40} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f} {result['errors']:>7}")
+    
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'flask': version('flask'),
+            'sqlalchemy': version('sqlalchemy'),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split('://')[0],
+            'dataset': {
+                'users': args.users,
+                'products': args.products,
+                'categories': args.categories,
+                'orders_per_user': args.orders_per_user,
+                'items_per_basket': args.items_per_basket,
+                'seed': args.seed
+            },
+            'iterations': args.iterations,
+            'warmup': args.warmup
+        },
+        'scenarios': results
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nResults written to {args.output}")
+    
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for production (pre-fork)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- The app is created once in the master (preload_app) and forked, so
+  workers share its memory pages and start instantly
+- Each worker drops the inherited database connections after fork
+- Workers are recycled after MAX_REQUESTS requests (plus jitter, so they
+  don't all restart at once) to contain memory growth
+- `kill -HUP <master pid>` starts new workers and gracefully stops the old
+  ones; with preload_app the master keeps the old code, so deploy new code
+  with USR2 + QUIT (binary upgrade) or a full restart
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 0)) or multiprocessing.cpu_count()
+threads = int(os.getenv('WEB_THREADS', 1))
+preload_app = True
+
+max_requests = int(os.getenv('MAX_REQUESTS', 10000))  # 0 disables recycling
+max_requests_jitter = int(os.getenv('MAX_REQUESTS_JITTER', max_requests // 10))
+
+timeout = int(os.getenv('WORKER_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = os.getenv('ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections"""
+    from src.database import db
+    
+    app = server.app.wsgi()
+    with app.app_context():
+        # close=False: leave the parent's connections alone, just forget them
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,40 @@
+import argparse
+from src.app import create_app
+from src.models.user import User
+from src.services.product_import_service import ProductImportService
+
+parser = argparse.ArgumentParser(description='Bulk import products from CSV or JSONL')
+parser.add_argument('path', help='CSV (with header row) or JSONL file')
+parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+parser.add_argument('--upsert', action='store_true', help='Update existing products with the same name')
+parser.add_argument('--admin', default='admin', help='Admin username recorded as creator (default: admin)')
+parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per transaction (default: 1000)')
+args = parser.parse_args()
+
+file_format = args.format or ('jsonl' if args.path.endswith(('.jsonl', '.ndjson')) else 'csv')
+
+app = create_app()
+
+with app.app_context():
+    admin = User.query.filter_by(username=args.admin).first()
+    
+    if not admin or not admin.is_admin():
+        print(f"❌ Admin user '{args.admin}' not found (run create_admin.py first)")
+    else:
+        with open(args.path, 'rb') as f:
+            report, error = ProductImportService.import_products(
+                user=admin,
+                stream=f,
+                file_format=file_format,
+                upsert=args.upsert,
+                chunk_size=args.chunk_size
+            )
+        
+        if error:
+            print(f"❌ {error}")
+        else:
+            print(f"✅ Import finished: {report['created']} created, {report['updated']} updated, {report['failed']} failed")
+            for e in report['errors']:
+                print(f"   row {e['row']}: {e['message']}")
+            if report['errors_truncated']:
+                print("   ... more errors not shown")
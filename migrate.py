@@ -0,0 +1,35 @@
+"""
+Apply database migrations (src/migrations.py)
+
+    python migrate.py              # upgrade to the latest version
+    python migrate.py --status     # show current and latest version
+    python migrate.py --target 3   # upgrade up to version 3
+
+Uses APP_CONFIG (default: development) to pick the database.
+"""
+import argparse
+import os
+from src.app import create_app
+from src.migrations import LATEST_VERSION, MIGRATIONS, get_schema_version, migrate
+
+parser = argparse.ArgumentParser(description='Apply database migrations')
+parser.add_argument('--config', default=os.getenv('APP_CONFIG', 'development'))
+parser.add_argument('--target', type=int, help='Stop at this version')
+parser.add_argument('--status', action='store_true', help='Show versions and exit')
+args = parser.parse_args()
+
+app = create_app(args.config, check_schema=False)
+
+with app.app_context():
+    current = get_schema_version()
+    
+    if args.status:
+        print(f"Schema version: {current} (latest: {LATEST_VERSION})")
+        for version, name, _ in MIGRATIONS:
+            print(f"  {'✅' if version <= current else '⏳'} {version}: {name}")
+    else:
+        applied = migrate(target=args.target)
+        if applied:
+            print(f"✅ Migrated to version {applied[-1][0]}")
+        else:
+            print(f"✅ Already at version {current}")
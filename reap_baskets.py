@@ -0,0 +1,36 @@
+"""
+Mark stale baskets abandoned and purge old abandoned ones (run from cron)
+
+    python reap_baskets.py
+    python reap_baskets.py --abandon-after-days 7 --purge-after-days 30
+
+Defaults come from BASKET_ABANDON_AFTER_DAYS / BASKET_PURGE_AFTER_DAYS.
+Uses APP_CONFIG (default: development) to pick the database.
+"""
+import argparse
+import os
+from datetime import timedelta
+from src.app import create_app
+from src.services.basket_reaper_service import BasketReaperService
+
+parser = argparse.ArgumentParser(description='Retire baskets that were never checked out')
+parser.add_argument('--config', default=os.getenv('APP_CONFIG', 'development'))
+parser.add_argument('--abandon-after-days', type=float)
+parser.add_argument('--purge-after-days', type=float, help='0 keeps abandoned baskets')
+parser.add_argument('--batch-size', type=int)
+args = parser.parse_args()
+
+app = create_app(args.config)
+
+with app.app_context():
+    abandon_days = args.abandon_after_days if args.abandon_after_days is not None else app.config['BASKET_ABANDON_AFTER_DAYS']
+    purge_days = args.purge_after_days if args.purge_after_days is not None else app.config['BASKET_PURGE_AFTER_DAYS']
+    
+    report = BasketReaperService.reap(
+        abandon_after=timedelta(days=abandon_days),
+        purge_after=timedelta(days=purge_days) if purge_days else None,
+        batch_size=args.batch_size or app.config['BASKET_REAPER_BATCH_SIZE']
+    )
+    
+    print(f"✅ Abandoned {report['abandoned']} baskets, purged {report['purged_baskets']} baskets "
+          f"and {report['purged_items']} items in {report['batches']} batches")
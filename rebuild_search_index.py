@@ -0,0 +1,13 @@
+from src.app import create_app
+from src.repositories.search_repository import SearchRepository
+
+app = create_app()
+
+with app.app_context():
+    # Re-index every product (needed once for catalogs created before search index)
+    count = SearchRepository.rebuild_index()
+    
+    if count is None:
+        print("❌ Full-text search is not supported on this database (using ILIKE fallback)")
+    else:
+        print(f"✅ Search index rebuilt: {count} products indexed")
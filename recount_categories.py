@@ -0,0 +1,13 @@
+from src.app import create_app
+from src.database import db
+from src.repositories.category_repository import CategoryRepository
+
+app = create_app()
+
+with app.app_context():
+    # Rebuild category counts from the products table (repairs drifted counts)
+    CategoryRepository.recount()
+    db.session.commit()
+    
+    categories = CategoryRepository.get_categories()
+    print(f"✅ Category counts rebuilt: {len(categories)} categories with products")
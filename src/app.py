@@ -3,11 +3,33 @@ from flask_cors import CORS
 from src.config import config
 from src.database import init_db
 
-def create_app(config_name='development'):
+def create_app(config_name='development', check_schema=True):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     CORS(app)
-    init_db(app)
+    
+    # Client IP from X-Forwarded-For when behind trusted proxies (rate limits)
+    from src.middleware.proxy import init_proxy_fix
+    init_proxy_fix(app)
+    init_db(app, check_schema=check_schema)
+    
+    from src.middleware.auth_middleware import init_principal_cache
+    init_principal_cache(app)
+    
+    from src.utils.password_hasher import init_password_hasher
+    init_password_hasher(app)
+    
+    # Before the unit of work: after_request hooks run in reverse order,
+    # so request timing includes the commit
+    from src.middleware.metrics import init_metrics
+    init_metrics(app)
+    
+    # Throttled requests are answered before any DB or bcrypt work
+    from src.middleware.rate_limit import init_rate_limiter
+    init_rate_limiter(app)
+    
+    from src.middleware.unit_of_work import init_unit_of_work
+    init_unit_of_work(app)
     
     # Register blueprints
     from src.routes.auth_routes import auth_bp
@@ -18,6 +40,9 @@ def create_app(config_name='development'):
     app.register_blueprint(product_bp)
     app.register_blueprint(basket_bp)
     
+    from src.services.basket_reaper_service import start_basket_reaper
+    app.extensions['basket_reaper'] = start_basket_reaper(app)
+    
     @app.route('/health', methods=['GET'])
     def health_check():
         return {
@@ -25,6 +50,15 @@ def create_app(config_name='development'):
             'message': 'Flask backend is running! 🚀'
         }, 200
     
+    # Engine and pool internals: admins and API keys only
+    from src.middleware.auth_middleware import api_key_or_admin_required
+    
+    @app.route('/health/database', methods=['GET'])
+    @api_key_or_admin_required
+    def database_health(current_user):
+        from src.database import get_engine_settings
+        return get_engine_settings(), 200
+    
     return app
 
 if __name__ == '__main__':
@@ -1,23 +1,125 @@
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Named database engine profiles, selected with DATABASE_ENGINE_PROFILE.
+# - pragmas: applied to every new SQLite connection (see src/database.py)
+# - options: passed to create_engine (SQLALCHEMY_ENGINE_OPTIONS wins on conflict)
+DATABASE_ENGINE_PROFILES = {
+    # File-backed SQLite: WAL lets readers run alongside a writer, and
+    # busy_timeout makes writers wait for the lock instead of failing
+    'sqlite': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),  # durable across app crashes, not power loss
+            'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+            'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),  # negative = KiB (64 MB)
+            'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),  # bytes
+        },
+        'options': {},
+    },
+    # PostgreSQL/MySQL: connection pool sized per process
+    'server': {
+        'pragmas': {},
+        'options': {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),  # seconds
+            'pool_pre_ping': True,
+        },
+    },
+    # SQLAlchemy defaults, nothing applied
+    'none': {
+        'pragmas': {},
+        'options': {},
+    },
+}
+
 class Config:
     """Base configuration class."""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///market.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Engine profile name, or 'auto' to pick 'sqlite' / 'server' from the URI
+    DATABASE_ENGINE_PROFILE = os.getenv('DATABASE_ENGINE_PROFILE', 'auto')
+    DATABASE_ENGINE_PROFILES = DATABASE_ENGINE_PROFILES
+    
+    # Apply pending migrations at startup instead of refusing to start
+    # (production runs `python migrate.py` as a deploy step)
+    DATABASE_AUTO_MIGRATE = os.getenv('DATABASE_AUTO_MIGRATE', 'false').lower() in ('1', 'true', 'yes')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your_jwt_secret_key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)  # Token expires after 1 hour
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)  # Refresh token lasts 30 days
     CORS_HEADERS = 'Content-Type'
+    
+    # Authenticated principal cache (per process), see jwt_required_custom.
+    # User changes only clear the cache of the worker that made them: other
+    # gunicorn workers may serve a demoted/deleted user's old role for up to
+    # PRINCIPAL_CACHE_TTL seconds. Lower it (or set 0) if that is too long.
+    PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', 60))  # seconds, 0 disables
+    PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+    
+    # Password hashing (bcrypt), see src/utils/password_hasher.py
+    # Changing the cost rehashes stored passwords on next successful login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None  # None = CPU count
+    # Unset = 4 x workers; 0 = no queue (reject whenever every worker is busy)
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ['PASSWORD_HASH_QUEUE_SIZE']) if os.getenv('PASSWORD_HASH_QUEUE_SIZE') else None
+    PASSWORD_HASH_TIMEOUT = 30  # seconds
+    
+    # Max operations accepted by POST /basket/items:batch
+    BASKET_BATCH_MAX_OPERATIONS = int(os.getenv('BASKET_BATCH_MAX_OPERATIONS', 100))
+    
+    # API keys accepted by GET /products/export (comma-separated), for partners/indexers
+    API_KEYS = [key.strip() for key in os.getenv('API_KEYS', '').split(',') if key.strip()]
+    
+    # Bulk product import: rows per executemany/commit
+    PRODUCT_IMPORT_CHUNK_SIZE = int(os.getenv('PRODUCT_IMPORT_CHUNK_SIZE', 1000))
+    
+    # Cache-Control sent with catalog responses (ETag is always sent).
+    # Raise max-age to let a reverse proxy serve listings without revalidating.
+    CATALOG_CACHE_CONTROL = os.getenv('CATALOG_CACHE_CONTROL', 'public, max-age=0, must-revalidate')
+    
+    # Request/SQL/bcrypt metrics in Prometheus format at GET /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted
+    # (0 = clients connect directly), see src/middleware/proxy.py
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    
+    # Token-bucket rate limits per blueprint, see src/middleware/rate_limit.py
+    # Rates are "<requests>/<period>": the burst size and how fast it refills
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RATE_LIMIT_STORAGE = os.getenv(  # 'memory' or a SQLite file shared by all workers
+        'RATE_LIMIT_STORAGE', os.path.join(tempfile.gettempdir(), 'mymarket_rate_limits.db')
+    )
+    RATE_LIMITS = {
+        'auth': {
+            'methods': ['POST'],  # login/signup (bcrypt), not GET /auth/me
+            'ip': os.getenv('RATE_LIMIT_AUTH_IP', '30/minute'),
+            'username': os.getenv('RATE_LIMIT_AUTH_USERNAME', '10/minute'),
+        },
+    }
+    
+    # Abandoned basket reaper (src/services/basket_reaper_service.py, reap_baskets.py)
+    BASKET_ABANDON_AFTER_DAYS = float(os.getenv('BASKET_ABANDON_AFTER_DAYS', 14))
+    BASKET_PURGE_AFTER_DAYS = float(os.getenv('BASKET_PURGE_AFTER_DAYS', 0))  # 0 = keep abandoned baskets
+    BASKET_REAPER_BATCH_SIZE = int(os.getenv('BASKET_REAPER_BATCH_SIZE', 500))
+    BASKET_REAPER_INTERVAL = int(os.getenv('BASKET_REAPER_INTERVAL', 0))  # seconds, 0 = no in-process thread
+    
+    # Sharded stock (products with stock_shards > 0): how often a worker may
+    # copy the real total into products.stock, see StockShardRepository
+    STOCK_SHARD_SYNC_INTERVAL = float(os.getenv('STOCK_SHARD_SYNC_INTERVAL', 1.0))  # seconds
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     TESTING = False
+    DATABASE_AUTO_MIGRATE = True
 
 class ProductionConfig(Config):
     """Production configuration."""
@@ -29,8 +131,12 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # In-memory database for testing
+    DATABASE_AUTO_MIGRATE = True  # Every in-memory database starts empty
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)  # Shorter expiry for testing
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=1)  # Shorter refresh token expiry for testing
+    BCRYPT_LOG_ROUNDS = 4  # Minimum cost keeps tests fast
+    RATE_LIMIT_ENABLED = False  # Test clients log in repeatedly from one address
+    RATE_LIMIT_STORAGE = 'memory'
 
 
 
@@ -1,3 +1,6 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
@@ -7,18 +10,137 @@ db = SQLAlchemy()
 bcrypt = Bcrypt()
 jwt = JWTManager()
 
-def init_db(app):
-    """Initialize database and related extensions with the Flask app."""
+def resolve_engine_profile(app):
+    """
+    Pick the engine profile for the app's database URI
+    
+    'auto' selects 'sqlite' for SQLite URIs and 'server' for everything else.
+    The profile's engine options are merged under SQLALCHEMY_ENGINE_OPTIONS,
+    so anything set there explicitly takes precedence.
+    
+    Returns:
+        (name, profile) tuple, profile being {'pragmas': {...}, 'options': {...}}
+    """
+    profiles = app.config['DATABASE_ENGINE_PROFILES']
+    name = app.config.get('DATABASE_ENGINE_PROFILE', 'auto')
+    dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    
+    if name == 'auto':
+        name = 'sqlite' if dialect == 'sqlite' else 'server'
+    if name not in profiles:
+        raise ValueError(f"Unknown DATABASE_ENGINE_PROFILE '{name}', expected one of: {', '.join(profiles)}")
+    
+    profile = profiles[name]
+    if profile['pragmas'] and dialect != 'sqlite':
+        raise ValueError(f"Engine profile '{name}' sets SQLite pragmas but the database is {dialect}")
+    
+    return name, {
+        'pragmas': dict(profile['pragmas']),
+        'options': {**profile['options'], **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    }
+
+
+def _apply_pragmas(engine, pragmas):
+    """Run the profile's PRAGMA statements on every new DBAPI connection"""
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+
+def get_engine_settings():
+    """
+    Describe the active engine configuration (call inside app context)
+    
+    Pragma values are read back from a pooled connection, so they show what
+    SQLite actually applied (an in-memory database reports journal_mode
+    'memory', for example).
+    
+    Returns:
+        Dict with profile name, dialect, engine options, pragmas and pool status
+    """
+    engine = db.engine
+    name, profile = current_app.extensions['db_engine_profile']
+    
+    effective = {}
+    if profile['pragmas']:
+        with engine.connect() as conn:
+            for pragma in profile['pragmas']:
+                effective[pragma] = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+    
+    return {
+        'profile': name,
+        'dialect': engine.dialect.name,
+        'engine_options': profile['options'],
+        'pragmas': profile['pragmas'],
+        'effective_pragmas': effective,
+        'pool': {
+            'class': type(engine.pool).__name__,
+            'status': engine.pool.status()
+        }
+    }
+
+
+def init_db(app, check_schema=True):
+    """
+    Initialize database and related extensions with the Flask app.
+    
+    No DDL runs here: startup only checks the schema version, see ensure_schema.
+    """
+    name, profile = resolve_engine_profile(app)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = profile['options']
+    app.extensions['db_engine_profile'] = (name, profile)
+    
     db.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
     with app.app_context():
-        # Import all models explicitly BEFORE creating tables
-        # Order matters: import parent tables before child tables
+        if profile['pragmas']:
+            _apply_pragmas(db.engine, profile['pragmas'])
+        
+        # Import all models so mappers (and their event listeners) are configured
         from src.models.user import User
         from src.models.product import Product
         from src.models.basket import Basket, BasketItem
+        from src.models.catalog import CatalogVersion
+        from src.models.category import Category
+        from src.models.order import Order, OrderLine
+        from src.models.schema_migration import SchemaMigration
+        from src.models.stock_shard import StockShard
         
-        # Now create all tables
-        db.create_all()
-        print("✅ Database and tables created.")
\ No newline at end of file
+        if check_schema:
+            ensure_schema(app)
+
+
+def ensure_schema(app):
+    """
+    Compare the database schema version with the code (one query)
+    
+    Behind: migrate when DATABASE_AUTO_MIGRATE is on (development, tests),
+    otherwise refuse to start until `python migrate.py` has been run. An
+    empty database (every in-memory test database) is created from the
+    models and stamped with the latest version instead of replaying every
+    migration.
+    """
+    from src.migrations import LATEST_VERSION, create_schema, get_schema_version, is_empty, migrate
+    
+    version = get_schema_version()
+    if version == LATEST_VERSION:
+        return
+    
+    if version > LATEST_VERSION:
+        app.logger.warning(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+        return
+    
+    if not app.config.get('DATABASE_AUTO_MIGRATE', False):
+        raise RuntimeError(
+            f"Database schema is at version {version}, this code needs {LATEST_VERSION}. "
+            "Run `python migrate.py` first."
+        )
+    
+    if version == 0 and is_empty():
+        create_schema(log=app.logger.info)
+    else:
+        migrate(log=app.logger.info)
@@ -1,3 +1,10 @@
-from src.middleware.auth_middleware import jwt_required_custom
+from src.middleware.auth_middleware import (
+    jwt_required_custom, api_key_or_admin_required, init_principal_cache, invalidate_principal
+)
+from src.middleware.principal import Principal
+from src.middleware.unit_of_work import init_unit_of_work
+from src.middleware.metrics import init_metrics
+from src.middleware.rate_limit import init_rate_limiter
+from src.middleware.proxy import init_proxy_fix
 
-__all__ = ['jwt_required_custom']
\ No newline at end of file
+__all__ = ['jwt_required_custom', 'api_key_or_admin_required', 'init_principal_cache', 'invalidate_principal', 'Principal', 'init_unit_of_work', 'init_metrics', 'init_rate_limiter', 'init_proxy_fix']
\ No newline at end of file
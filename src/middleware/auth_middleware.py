@@ -1,11 +1,80 @@
+import hmac
 from functools import wraps
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import current_app, has_app_context, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from sqlalchemy import event
+from src.middleware.principal import Principal
+from src.models.user import User
 from src.repositories.user_repository import UserRepository
+from src.utils.cache import TTLCache
 from src.utils.responses import error_response
 
+PRINCIPAL_CACHE_KEY = 'principal_cache'
+
+
+def init_principal_cache(app):
+    """Attach a per-process principal cache to the app"""
+    app.extensions[PRINCIPAL_CACHE_KEY] = TTLCache(
+        maxsize=app.config.get('PRINCIPAL_CACHE_SIZE', 10000),
+        ttl=app.config.get('PRINCIPAL_CACHE_TTL', 60)
+    )
+
+
+def get_principal_cache():
+    """Principal cache of the current app (None outside an app context)"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(PRINCIPAL_CACHE_KEY)
+
+
+def invalidate_principal(user_id):
+    """Forget the cached principal for a user (call after changing the user)"""
+    cache = get_principal_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_changed_user(mapper, connection, target):
+    """
+    Any ORM update/delete of a User drops its cached principal
+    
+    Only in this process: other workers keep their copy until it expires
+    (PRINCIPAL_CACHE_TTL).
+    """
+    invalidate_principal(target.id)
+
+
+def resolve_principal(user_id):
+    """
+    Get the principal for a user ID
+    
+    Served from the principal cache when possible; the users table is only
+    hit on a miss (first request, TTL expiry or after the user changed).
+    """
+    cache = get_principal_cache()
+    if cache is not None:
+        principal = cache.get(user_id)
+        if principal is not None:
+            return principal
+    
+    user = UserRepository.get_user_by_id(user_id)
+    if not user:
+        return None
+    
+    principal = Principal.from_user(user)
+    if cache is not None:
+        cache.set(user_id, principal)
+    return principal
+
+
 def jwt_required_custom(fn):
     """
-    Custom JWT decorator that also fetches user from database
+    Custom JWT decorator that also resolves the current user
+    
+    Routes receive a Principal (id, username, email, role), not an ORM
+    User row, so most requests never touch the users table.
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
@@ -17,12 +86,17 @@ def jwt_required_custom(fn):
             user_id_str = get_jwt_identity()
             user_id = int(user_id_str)
             
-            # Fetch user from database
-            user = UserRepository.get_user_by_id(user_id)
+            user = resolve_principal(user_id)
             
             if not user:
                 return error_response("User not found", 404)
             
+            # Role is embedded in the token; a token issued before a role
+            # change must not keep the old privileges
+            token_role = get_jwt().get('role')
+            if token_role is not None and token_role != user.role:
+                return error_response("Token is no longer valid, please log in again", 401)
+            
             # Pass user to the route function
             return fn(current_user=user, *args, **kwargs)
             
@@ -31,4 +105,34 @@ def jwt_required_custom(fn):
         except Exception as e:
             return error_response(f"Authentication failed: {str(e)}", 401)
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def api_key_or_admin_required(fn):
+    """
+    Allow either a configured API key (X-API-Key header) or an admin JWT
+    
+    For machine clients such as partners and the search indexer.
+    current_user is None when the request was authenticated by API key.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        api_key = request.headers.get('X-API-Key')
+        if api_key:
+            valid = any(
+                hmac.compare_digest(api_key, key)
+                for key in current_app.config.get('API_KEYS', [])
+            )
+            if not valid:
+                return error_response("Invalid API key", 401)
+            return fn(current_user=None, *args, **kwargs)
+        
+        @jwt_required_custom
+        def admin_only(current_user):
+            if not current_user.is_admin():
+                return error_response("Admin access or API key required", 403)
+            return fn(current_user=current_user, *args, **kwargs)
+        
+        return admin_only()
+    
+    return wrapper
@@ -0,0 +1,46 @@
+import hashlib
+from functools import wraps
+from flask import current_app, make_response, request
+from src.repositories.catalog_repository import CatalogRepository
+
+
+def catalog_etag():
+    """
+    Strong ETag value (unquoted) for the current catalog request
+    
+    Built from the catalog version, the newest products.updated_at and the
+    request path and query string, so the same URL maps to the same body
+    until some product changes, stock taken by a checkout included.
+    """
+    version, last_write = CatalogRepository.get_validator()
+    args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1(f'{version}|{last_write}|{request.path}|{args}'.encode('utf-8')).hexdigest()
+    return digest[:32]
+
+
+def catalog_cached(fn):
+    """
+    Conditional GET for catalog endpoints
+    
+    - Adds ETag and Cache-Control headers to successful responses
+    - Answers If-None-Match with 304 before the route (and its listing
+      query) runs
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        etag = catalog_etag()
+        cache_control = current_app.config.get('CATALOG_CACHE_CONTROL')
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag)
+        if cache_control:
+            response.headers['Cache-Control'] = cache_control
+        return response
+    
+    return wrapper
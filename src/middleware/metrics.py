@@ -0,0 +1,116 @@
+import time
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from src.database import db
+from src.middleware.auth_middleware import api_key_or_admin_required
+from src.utils.metrics import MetricsRegistry
+
+METRICS_KEY = 'metrics'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class AppMetrics:
+    """Metrics recorded per endpoint (blueprint.view name)"""
+    
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter(
+            'http_requests_total', 'HTTP requests by endpoint, method and status',
+            ('endpoint', 'method', 'status')
+        )
+        self.latency = self.registry.histogram(
+            'http_request_duration_seconds', 'Request latency, including commit',
+            ('endpoint',)
+        )
+        self.sql_statements = self.registry.counter(
+            'db_statements_total', 'SQL statements executed', ('endpoint',)
+        )
+        self.sql_seconds = self.registry.counter(
+            'db_statement_duration_seconds_total', 'Time spent executing SQL', ('endpoint',)
+        )
+        self.sql_per_request = self.registry.histogram(
+            'db_statements_per_request', 'SQL statements per request', ('endpoint',),
+            buckets=(1, 2, 3, 5, 10, 20, 50, 100)
+        )
+        self.password_hash = self.registry.histogram(
+            'password_hash_duration_seconds', 'bcrypt time per operation (excludes queueing)',
+            ('endpoint', 'operation'),
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+        )
+
+
+def _endpoint():
+    # Unmatched URLs share one label so random paths can't grow the series
+    return request.endpoint or 'unmatched'
+
+
+def get_metrics():
+    """Metrics of the current app (None if disabled)"""
+    return current_app.extensions.get(METRICS_KEY)
+
+
+def init_metrics(app):
+    """
+    Per-request performance metrics, exposed at GET /metrics
+    
+    Request latency and status come from before/after_request hooks, SQL
+    count/time from engine cursor events, bcrypt time from the password
+    hasher. Per-request totals are kept on `g` and folded into the registry
+    once per request, so each SQL statement only costs two perf_counter calls.
+    
+    Must be registered before the unit of work so the COMMIT is measured.
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    
+    metrics = app.extensions[METRICS_KEY] = AppMetrics()
+    
+    with app.app_context():
+        engine = db.engine
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_started'] = time.perf_counter()
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('metrics_started', None)
+        if started is None or not has_request_context() or 'metrics_started' not in g:
+            return
+        g.metrics_sql_count += 1
+        g.metrics_sql_seconds += time.perf_counter() - started
+    
+    def observe_password_hash(operation, seconds):
+        endpoint = _endpoint() if has_request_context() else 'none'
+        metrics.password_hash.observe(seconds, endpoint, operation)
+    
+    hasher = app.extensions.get('password_hasher')
+    if hasher is not None:
+        hasher.observer = observe_password_hash
+    
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_sql_seconds = 0.0
+    
+    @app.after_request
+    def record_request(response):
+        if 'metrics_started' not in g:
+            return response
+        
+        endpoint = _endpoint()
+        metrics.latency.observe(time.perf_counter() - g.metrics_started, endpoint)
+        metrics.requests.inc(endpoint, request.method, str(response.status_code))
+        metrics.sql_per_request.observe(g.metrics_sql_count, endpoint)
+        if g.metrics_sql_count:
+            metrics.sql_statements.inc(endpoint, amount=g.metrics_sql_count)
+            metrics.sql_seconds.inc(endpoint, amount=g.metrics_sql_seconds)
+        return response
+    
+    # Per-route traffic is internal: scrape with an X-API-Key (or admin JWT)
+    @app.route('/metrics', methods=['GET'])
+    @api_key_or_admin_required
+    def metrics_endpoint(current_user):
+        return Response(metrics.registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,44 @@
+class Principal:
+    """
+    Authenticated user as seen by route handlers
+    
+    A plain, session-independent snapshot of the fields routes need
+    (id, role, profile). It is safe to cache across requests, unlike an
+    ORM User row which is bound to one request's session.
+    """
+    
+    __slots__ = ('id', 'username', 'email', 'role', 'created_at')
+    
+    def __init__(self, id, username, email, role, created_at):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.created_at = created_at
+    
+    @classmethod
+    def from_user(cls, user):
+        """Build a principal from a User model"""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            created_at=user.created_at.isoformat()
+        )
+    
+    def __repr__(self):
+        return f'<Principal {self.username}>'
+    
+    def to_dict(self):
+        """Same shape as User.to_dict()"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'created_at': self.created_at
+        }
+    
+    def is_admin(self):
+        """Check if user has admin role"""
+        return self.role == 'admin'
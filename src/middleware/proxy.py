@@ -0,0 +1,16 @@
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+
+def init_proxy_fix(app):
+    """
+    Trust X-Forwarded-* headers from PROXY_FIX_X_FOR reverse proxies
+    
+    Behind nginx/a load balancer, request.remote_addr is the proxy's
+    address, so every client would share one rate limit bucket. Set
+    PROXY_FIX_X_FOR to the number of proxies in front of gunicorn (usually
+    1). Leave it at 0 when clients connect directly: the header is then
+    client-controlled and must be ignored.
+    """
+    x_for = app.config.get('PROXY_FIX_X_FOR', 0)
+    if x_for:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=x_for, x_proto=x_for, x_host=x_for)
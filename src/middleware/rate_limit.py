@@ -0,0 +1,92 @@
+from flask import request
+from src.utils.rate_limit import create_bucket_store, parse_rate
+from src.utils.responses import error_response
+
+RATE_LIMITER_KEY = 'rate_limiter'
+
+
+def _client_ip():
+    # Real client address behind a reverse proxy needs PROXY_FIX_X_FOR, see init_proxy_fix
+    return request.remote_addr or 'unknown'
+
+
+def _username():
+    # Body is parsed once and cached by Flask, the view reads it again for free
+    data = request.get_json(silent=True)
+    username = data.get('username') if isinstance(data, dict) else None
+    return str(username).strip().lower() if username else None
+
+
+# Scope name -> key function (None = scope does not apply to this request)
+SCOPES = {
+    'ip': _client_ip,
+    'username': _username,
+}
+
+
+def too_many_requests(retry_after):
+    """429 with Retry-After (seconds)"""
+    response, status_code = error_response("Too many requests, please try again later", 429)
+    response.headers['Retry-After'] = str(max(1, retry_after))
+    return response, status_code
+
+
+def init_rate_limiter(app):
+    """
+    Token-bucket rate limits per blueprint, checked before the view runs
+    
+    RATE_LIMITS maps blueprint name -> {'methods': [...], scope: rate}, e.g.
+    {'auth': {'methods': ['POST'], 'ip': '20/minute', 'username': '5/minute'}}.
+    A request must have a token in every scope's bucket; otherwise it gets
+    a 429 before any DB or bcrypt work. All scopes are checked before any
+    token is taken, so a request denied by one scope doesn't drain the
+    others (e.g. a locked username doesn't use up the client's IP budget).
+    
+    RATE_LIMIT_STORAGE is 'memory' (one process) or a SQLite file path
+    shared by all workers on the host.
+    """
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return
+    
+    limits = {}
+    for blueprint, settings in app.config.get('RATE_LIMITS', {}).items():
+        methods = {method.upper() for method in settings.get('methods', ['POST', 'PUT', 'PATCH', 'DELETE'])}
+        scopes = {}
+        for scope, rate in settings.items():
+            if scope == 'methods':
+                continue
+            if scope not in SCOPES:
+                raise ValueError(f"Unknown rate limit scope '{scope}' for blueprint '{blueprint}'")
+            scopes[scope] = parse_rate(rate)
+        limits[blueprint] = (methods, scopes)
+    
+    store = app.extensions[RATE_LIMITER_KEY] = create_bucket_store(app.config.get('RATE_LIMIT_STORAGE', 'memory'))
+    
+    @app.before_request
+    def check_rate_limit():
+        limit = limits.get(request.blueprint)
+        if not limit or request.method not in limit[0]:
+            return None
+        
+        buckets = []
+        for scope, (capacity, period) in limit[1].items():
+            value = SCOPES[scope]()
+            if value is not None:
+                buckets.append((f'{request.blueprint}:{scope}:{value}', capacity, period))
+        
+        retry_after = 0
+        for bucket in buckets:
+            allowed, wait = store.peek(*bucket)
+            if not allowed:
+                retry_after = max(retry_after, wait)
+        
+        if not retry_after:
+            for bucket in buckets:
+                # A concurrent request may have taken the last token since peek
+                allowed, wait = store.take(*bucket)
+                if not allowed:
+                    retry_after = max(retry_after, wait)
+        
+        if retry_after:
+            return too_many_requests(retry_after)
+        return None
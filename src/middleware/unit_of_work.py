@@ -0,0 +1,65 @@
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.database import db
+from src.utils.responses import error_response
+
+WRITES_KEY = 'uow_has_writes'
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session, flush_context):
+    session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _clear_writes(session):
+    session.info.pop(WRITES_KEY, None)
+
+
+def has_pending_writes(session):
+    """Check if the session has changes that still need a COMMIT"""
+    return bool(
+        session.info.get(WRITES_KEY)
+        or session.new or session.dirty or session.deleted
+    )
+
+
+def init_unit_of_work(app):
+    """
+    Request-scoped unit of work
+    
+    Repositories only add/flush. After each request:
+    - 2xx/3xx response with changes: one COMMIT for everything the request did
+    - 4xx/5xx response: ROLLBACK, so a failed request leaves no partial writes
+    - read-only request: nothing to commit
+    """
+    @app.after_request
+    def commit_unit_of_work(response):
+        session = db.session()
+        
+        if response.status_code >= 400:
+            if session.in_transaction():
+                session.rollback()
+            return response
+        
+        if not has_pending_writes(session):
+            return response
+        
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            current_app.logger.exception("Unit of work commit failed")
+            error, status_code = error_response(f"Server error: {str(e)}", 500)
+            error.status_code = status_code
+            return error
+        
+        return response
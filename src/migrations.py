@@ -0,0 +1,405 @@
+"""
+Versioned schema migrations
+
+Each migration is (version, name, function) and runs once, in order, from
+`python migrate.py` (or automatically where DATABASE_AUTO_MIGRATE is on).
+Append new migrations at the end; never change one that has shipped.
+Migrations work on the table definitions in this module (Core statements),
+never on the ORM models, which describe the latest schema only.
+"""
+from datetime import datetime
+from sqlalchemy import MetaData, Table
+from sqlalchemy.exc import DBAPIError
+from src.database import db
+from src.models.schema_migration import SchemaMigration
+
+
+# Tables as the migrations below knew them. Migrations never load the ORM
+# models: those map the current schema, including columns that a later,
+# still pending migration has yet to add.
+_products = db.table(
+    'products',
+    db.column('id'), db.column('name'), db.column('price'), db.column('stock'), db.column('category')
+)
+_categories = db.table(
+    'categories',
+    db.column('name'), db.column('product_count'), db.column('in_stock_count'),
+    db.column('updated_at', db.DateTime)
+)
+_baskets = db.table(
+    'baskets',
+    db.column('id'), db.column('user_id'), db.column('status'),
+    db.column('created_at', db.DateTime), db.column('updated_at', db.DateTime)
+)
+_basket_items = db.table(
+    'basket_items',
+    db.column('id'), db.column('basket_id'), db.column('product_id'), db.column('quantity')
+)
+_orders = db.table(
+    'orders',
+    db.column('id'), db.column('user_id'), db.column('total_items'), db.column('total_quantity'),
+    db.column('total_price'), db.column('created_at', db.DateTime), db.column('completed_at', db.DateTime)
+)
+_order_lines = db.table(
+    'order_lines',
+    db.column('order_id'), db.column('product_id'), db.column('product_name'),
+    db.column('unit_price'), db.column('quantity'), db.column('subtotal')
+)
+_catalog_version = db.table(
+    'catalog_version',
+    db.column('id'), db.column('version'), db.column('updated_at', db.DateTime)
+)
+
+
+# Schema created by migration 1, frozen as it shipped. Later schema changes
+# are their own migrations; fresh databases that skip the chain are built
+# from the models instead (see create_schema).
+_V1_SCHEMA = MetaData()
+
+Table(
+    'users', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('username', db.String(80), nullable=False, unique=True, index=True),
+    db.Column('email', db.String(120), nullable=False, unique=True, index=True),
+    db.Column('password_hash', db.String(128), nullable=False),
+    db.Column('role', db.String(50), nullable=False),
+    db.Column('created_at', db.DateTime)
+)
+Table(
+    'products', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('name', db.String(120), nullable=False, index=True),
+    db.Column('description', db.Text),
+    db.Column('price', db.Float, nullable=False),
+    db.Column('stock', db.Integer, nullable=False),
+    db.Column('category', db.String(50), index=True),
+    db.Column('image_url', db.String(255)),
+    db.Column('created_by', db.Integer, db.ForeignKey('users.id'), nullable=False),
+    db.Column('created_at', db.DateTime),
+    db.Column('updated_at', db.DateTime, index=True),
+    db.Index('ix_products_created_at_id', 'created_at', 'id')
+)
+Table(
+    'baskets', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), nullable=False),
+    db.Column('status', db.String(20), nullable=False),
+    db.Column('created_at', db.DateTime),
+    db.Column('updated_at', db.DateTime),
+    db.Index('ix_baskets_user_status_created', 'user_id', 'status', 'created_at')
+)
+Table(
+    'basket_items', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('basket_id', db.Integer, db.ForeignKey('baskets.id'), nullable=False),
+    db.Column('product_id', db.Integer, db.ForeignKey('products.id'), nullable=False),
+    db.Column('quantity', db.Integer, nullable=False),
+    db.Column('added_at', db.DateTime)
+)
+Table(
+    'orders', _V1_SCHEMA,
+    db.Column('id', db.Integer, db.ForeignKey('baskets.id'), primary_key=True, autoincrement=False),
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), nullable=False),
+    db.Column('total_items', db.Integer, nullable=False),
+    db.Column('total_quantity', db.Integer, nullable=False),
+    db.Column('total_price', db.Float, nullable=False),
+    db.Column('created_at', db.DateTime, nullable=False),
+    db.Column('completed_at', db.DateTime, nullable=False),
+    db.Index('ix_orders_user_created', 'user_id', 'created_at', 'id')
+)
+Table(
+    'order_lines', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('order_id', db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True),
+    db.Column('product_id', db.Integer),
+    db.Column('product_name', db.String(120), nullable=False),
+    db.Column('unit_price', db.Float, nullable=False),
+    db.Column('quantity', db.Integer, nullable=False),
+    db.Column('subtotal', db.Float, nullable=False)
+)
+Table(
+    'categories', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('name', db.String(50), nullable=False, unique=True, index=True),
+    db.Column('product_count', db.Integer, nullable=False),
+    db.Column('in_stock_count', db.Integer, nullable=False),
+    db.Column('updated_at', db.DateTime)
+)
+Table(
+    'catalog_version', _V1_SCHEMA,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('version', db.Integer, nullable=False),
+    db.Column('updated_at', db.DateTime)
+)
+
+# Non-unique indexes built by migration 5, frozen as it shipped
+_V5_INDEXES = [
+    ('ix_baskets_status_updated', 'baskets', 'status, updated_at'),
+    ('ix_baskets_user_status_created', 'baskets', 'user_id, status, created_at'),
+    ('ix_products_created_at_id', 'products', 'created_at, id'),
+    ('ix_products_category', 'products', 'category'),
+    ('ix_products_name', 'products', 'name'),
+    ('ix_products_updated_at', 'products', 'updated_at'),
+    ('ix_orders_user_created', 'orders', 'user_id, created_at, id'),
+    ('ix_order_lines_order_id', 'order_lines', 'order_id'),
+]
+
+
+def _create_tables():
+    # checkfirst, so databases created before migrations existed are adopted as-is
+    _V1_SCHEMA.create_all(db.session.connection(), checkfirst=True)
+
+
+def _create_search_index():
+    from src.repositories.search_repository import SearchRepository
+    # Index products that existed before the FTS table was created
+    SearchRepository.rebuild_index()
+
+
+def _backfill_categories():
+    # Build the materialized categories once for catalogs that predate it
+    if db.session.execute(db.select(_categories.c.name).limit(1)).first() is not None:
+        return
+    
+    rows = db.session.execute(
+        db.select(
+            _products.c.category,
+            db.func.count(_products.c.id),
+            db.func.sum(db.case((_products.c.stock > 0, 1), else_=0))
+        )
+        .where(_products.c.category.isnot(None))
+        .group_by(_products.c.category)
+    ).all()
+    if rows:
+        now = datetime.utcnow()
+        db.session.execute(_categories.insert(), [
+            {'name': name, 'product_count': total, 'in_stock_count': in_stock or 0, 'updated_at': now}
+            for name, total, in_stock in rows
+        ])
+
+
+def _backfill_orders(batch_size=500):
+    # Snapshot completed baskets that have no order yet, at current product
+    # prices (the best information left). Commits per batch.
+    while True:
+        baskets = db.session.execute(
+            db.select(_baskets.c.id, _baskets.c.user_id, _baskets.c.created_at, _baskets.c.updated_at)
+            .select_from(_baskets.outerjoin(_orders, _orders.c.id == _baskets.c.id))
+            .where(_baskets.c.status == 'completed', _orders.c.id.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not baskets:
+            return
+        
+        lines = {basket.id: {} for basket in baskets}
+        items = db.session.execute(
+            db.select(
+                _basket_items.c.basket_id, _basket_items.c.product_id, _basket_items.c.quantity,
+                _products.c.name, _products.c.price
+            )
+            .select_from(_basket_items.outerjoin(_products, _products.c.id == _basket_items.c.product_id))
+            .where(_basket_items.c.basket_id.in_(list(lines)))
+            .order_by(_basket_items.c.id)
+        )
+        for basket_id, product_id, quantity, name, price in items:
+            line = lines[basket_id].get(product_id)
+            if line:
+                line['quantity'] += quantity
+            else:
+                lines[basket_id][product_id] = {
+                    'order_id': basket_id,
+                    'product_id': product_id,
+                    'product_name': name if name is not None else f'Product #{product_id}',
+                    'unit_price': price if price is not None else 0,
+                    'quantity': quantity
+                }
+        
+        orders = []
+        order_lines = []
+        for basket in baskets:
+            basket_lines = list(lines[basket.id].values())
+            for line in basket_lines:
+                line['subtotal'] = line['unit_price'] * line['quantity']
+            orders.append({
+                'id': basket.id,
+                'user_id': basket.user_id,
+                'total_items': len(basket_lines),
+                'total_quantity': sum(line['quantity'] for line in basket_lines),
+                'total_price': sum(line['subtotal'] for line in basket_lines),
+                'created_at': basket.created_at,
+                'completed_at': basket.updated_at
+            })
+            order_lines.extend(basket_lines)
+        
+        db.session.execute(_orders.insert(), orders)
+        if order_lines:
+            db.session.execute(_order_lines.insert(), order_lines)
+        db.session.commit()
+
+
+def _create_model_indexes():
+    # Migration 1 skips tables that already exist, so indexes added later
+    # (keyset pagination, basket lookups, reaper scans) were never built on
+    # adopted databases. Unique indexes may need data cleanup first and get
+    # their own migration.
+    for name, table, columns in _V5_INDEXES:
+        db.session.execute(db.text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})'))
+
+
+def _merge_duplicate_basket_items():
+    # Keep the oldest line per (basket, product) with the summed quantity,
+    # then enforce one line per product so add_item can upsert
+    keys = (_basket_items.c.basket_id, _basket_items.c.product_id)
+    duplicates = db.session.execute(
+        db.select(*keys, db.func.min(_basket_items.c.id), db.func.sum(_basket_items.c.quantity))
+        .group_by(*keys)
+        .having(db.func.count() > 1)
+    ).all()
+    for basket_id, product_id, keep_id, quantity in duplicates:
+        db.session.execute(
+            _basket_items.update().where(_basket_items.c.id == keep_id).values(quantity=quantity)
+        )
+        db.session.execute(
+            _basket_items.delete().where(
+                _basket_items.c.basket_id == basket_id,
+                _basket_items.c.product_id == product_id,
+                _basket_items.c.id != keep_id
+            )
+        )
+    
+    db.session.execute(db.text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_basket_items_basket_product '
+        'ON basket_items (basket_id, product_id)'
+    ))
+
+
+def _add_stock_shards():
+    # Databases whose migration 1 ran before it was frozen got both from create_all
+    columns = {column['name'] for column in db.inspect(db.session.connection()).get_columns('products')}
+    if 'stock_shards' not in columns:
+        db.session.execute(db.text(
+            'ALTER TABLE products ADD COLUMN stock_shards INTEGER NOT NULL DEFAULT 0'
+        ))
+    db.session.execute(db.text(
+        'CREATE TABLE IF NOT EXISTS product_stock_shards ('
+        ' product_id INTEGER NOT NULL REFERENCES products (id),'
+        ' shard INTEGER NOT NULL,'
+        ' stock INTEGER NOT NULL,'
+        ' PRIMARY KEY (product_id, shard))'
+    ))
+
+
+def _seed_catalog_version():
+    from src.repositories.catalog_repository import CATALOG_ROW_ID
+    # bump_version only UPDATEs; inserting on first use raced between requests
+    exists = db.session.execute(
+        db.select(_catalog_version.c.id).where(_catalog_version.c.id == CATALOG_ROW_ID)
+    ).first()
+    if not exists:
+        db.session.execute(
+            _catalog_version.insert().values(id=CATALOG_ROW_ID, version=1, updated_at=datetime.utcnow())
+        )
+
+
+def _drop_ordered_basket_lines():
+    # Checkout now deletes a completed basket's lines once the order snapshot
+    # holds them; old ones kept ordered products from being deleted
+    ordered = db.select(_orders.c.id)
+    db.session.execute(
+        _basket_items.delete().where(
+            _basket_items.c.basket_id.in_(
+                db.select(_baskets.c.id).where(_baskets.c.status == 'completed', _baskets.c.id.in_(ordered))
+            )
+        )
+    )
+
+
+MIGRATIONS = [
+    (1, 'create tables', _create_tables),
+    (2, 'product full-text search index', _create_search_index),
+    (3, 'category counts', _backfill_categories),
+    (4, 'order snapshots', _backfill_orders),
+    (5, 'model indexes on existing tables', _create_model_indexes),
+    (6, 'merge duplicate basket lines, unique basket/product index', _merge_duplicate_basket_items),
+    (7, 'sharded stock counters', _add_stock_shards),
+    (8, 'seed catalog version row', _seed_catalog_version),
+    (9, 'drop basket lines of ordered baskets', _drop_ordered_basket_lines),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version():
+    """
+    Current schema version (0 for an empty database)
+
+    One indexed query on its own connection, so a missing table on
+    PostgreSQL doesn't abort the session's transaction.
+    """
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(db.select(db.func.max(SchemaMigration.version))).scalar() or 0
+    except DBAPIError:
+        return 0
+
+
+def is_empty():
+    """Check if the database has no tables yet (fresh install)"""
+    return not db.inspect(db.engine).get_table_names()
+
+
+def create_schema(log=print):
+    """
+    Build an empty database at the latest version without replaying migrations
+
+    create_all from the models, the search index, the seeded catalog row,
+    then every migration is recorded as applied. For fresh databases only
+    (tests, new development setups); existing ones must use migrate().
+    """
+    from src.repositories.catalog_repository import CATALOG_ROW_ID
+    from src.repositories.search_repository import SearchRepository
+
+    log(f"Creating schema at version {LATEST_VERSION}")
+    db.create_all()
+    SearchRepository.create_index()
+
+    now = datetime.utcnow()
+    db.session.execute(_catalog_version.insert().values(id=CATALOG_ROW_ID, version=1, updated_at=now))
+    db.session.add_all([
+        SchemaMigration(version=version, name=name, applied_at=now)
+        for version, name, _ in MIGRATIONS
+    ])
+    db.session.commit()
+
+
+def migrate(target=None, log=print):
+    """
+    Apply pending migrations up to `target` (default: latest)
+
+    Each migration is committed together with its schema_migrations row.
+
+    Returns:
+        List of (version, name) applied
+    """
+    target = LATEST_VERSION if target is None else target
+    current = get_schema_version()
+
+    if current == 0:
+        SchemaMigration.__table__.create(db.engine, checkfirst=True)
+
+    applied = []
+    for version, name, upgrade in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+
+        log(f"Applying migration {version}: {name}")
+        try:
+            upgrade()
+            db.session.add(SchemaMigration(version=version, name=name, applied_at=datetime.utcnow()))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        applied.append((version, name))
+
+    return applied
@@ -12,6 +12,12 @@ class Basket(db.Model):
     """
     
     __tablename__ = 'baskets'
+    __table_args__ = (
+        # Active basket lookup and order history (newest first) per user
+        db.Index('ix_baskets_user_status_created', 'user_id', 'status', 'created_at'),
+        # Stale/abandoned basket scans (basket reaper)
+        db.Index('ix_baskets_status_updated', 'status', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -27,13 +33,21 @@ class Basket(db.Model):
     
     def to_dict(self):
         """Convert basket to dictionary with items"""
+        # Serialize items and sum the total in a single pass
+        items = []
+        total_price = 0
+        for item in self.items:
+            item_data = item.to_dict()
+            total_price += item_data['subtotal']
+            items.append(item_data)
+        
         return {
             'id': self.id,
             'user_id': self.user_id,
             'status': self.status,
-            'items': [item.to_dict() for item in self.items],
-            'total_items': len(self.items),
-            'total_price': self.get_total_price(),
+            'items': items,
+            'total_items': len(items),
+            'total_price': total_price,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -56,6 +70,10 @@ class BasketItem(db.Model):
     """
     
     __tablename__ = 'basket_items'
+    __table_args__ = (
+        # One line per product: add_item upserts on this index
+        db.Index('uq_basket_items_basket_product', 'basket_id', 'product_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     basket_id = db.Column(db.Integer, db.ForeignKey('baskets.id'), nullable=False)
@@ -0,0 +1,20 @@
+from src.database import db
+from datetime import datetime
+
+class CatalogVersion(db.Model):
+    """
+    CatalogVersion Model - Single-row counter bumped by catalog writes
+    
+    Used with the newest products.updated_at to build ETags for catalog
+    endpoints: if neither moved, any cached listing is still valid and the
+    listing query can be skipped. Checkouts only move updated_at.
+    """
+    
+    __tablename__ = 'catalog_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.version}>'
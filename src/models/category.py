@@ -0,0 +1,34 @@
+from src.database import db
+from datetime import datetime
+
+class Category(db.Model):
+    """
+    Category Model - Materialized list of product categories
+    
+    Kept up to date from Product writes (see CategoryRepository) so the
+    navigation menu never has to scan the products table.
+    
+    Fields:
+    - name: Category name (same value as Product.category)
+    - product_count: Number of products in the category
+    - in_stock_count: Number of those products with stock > 0
+    """
+    
+    __tablename__ = 'categories'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    product_count = db.Column(db.Integer, default=0, nullable=False)
+    in_stock_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Category {self.name} ({self.product_count})>'
+    
+    def to_dict(self):
+        """Convert category to dictionary"""
+        return {
+            'name': self.name,
+            'product_count': self.product_count,
+            'in_stock_count': self.in_stock_count
+        }
@@ -0,0 +1,91 @@
+from src.database import db
+from datetime import datetime
+
+class Order(db.Model):
+    """
+    Order Model - Immutable snapshot of a checked-out basket
+    
+    Written once at checkout. The ID is the completed basket's ID, so
+    order IDs stay the same ones clients already know.
+    
+    Fields:
+    - total_items: Number of lines
+    - total_quantity: Sum of quantities
+    - total_price: Order total at checkout prices
+    - created_at: When the basket was started
+    - completed_at: When checkout happened
+    """
+    
+    __tablename__ = 'orders'
+    __table_args__ = (
+        # Order history per user, newest first (keyset pagination)
+        db.Index('ix_orders_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, db.ForeignKey('baskets.id'), primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    total_items = db.Column(db.Integer, default=0, nullable=False)
+    total_quantity = db.Column(db.Integer, default=0, nullable=False)
+    total_price = db.Column(db.Float, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationship: Order has many lines (never changed after checkout)
+    lines = db.relationship('OrderLine', backref='order', lazy=True, cascade='all, delete-orphan',
+                            order_by='OrderLine.id')
+    
+    def __repr__(self):
+        return f'<Order {self.id} user_id={self.user_id} total={self.total_price}>'
+    
+    def to_summary_dict(self):
+        """Convert order to dictionary without lines (order history)"""
+        return {
+            'id': self.id,
+            'status': 'completed',
+            'total_items': self.total_items,
+            'total_quantity': self.total_quantity,
+            'total_price': self.total_price,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat()
+        }
+    
+    def to_dict(self):
+        """Convert order to dictionary with lines"""
+        data = self.to_summary_dict()
+        data['user_id'] = self.user_id
+        data['items'] = [line.to_dict() for line in self.lines]
+        return data
+
+
+class OrderLine(db.Model):
+    """
+    OrderLine Model - One product line of an order, denormalized
+    
+    Name and price are copied from the product at checkout, so the order
+    reads the same forever, even if the product changes or is deleted.
+    product_id is kept for reference only (no foreign key).
+    """
+    
+    __tablename__ = 'order_lines'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer)
+    product_name = db.Column(db.String(120), nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    subtotal = db.Column(db.Float, nullable=False)
+    
+    def __repr__(self):
+        return f'<OrderLine {self.product_name} qty={self.quantity}>'
+    
+    def to_dict(self):
+        """Convert order line to dictionary"""
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'product_name': self.product_name,
+            'unit_price': self.unit_price,
+            'quantity': self.quantity,
+            'subtotal': self.subtotal
+        }
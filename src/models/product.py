@@ -10,7 +10,8 @@ class Product(db.Model):
     - name: Product name
     - description: Detailed description
     - price: Product price (in dollars)
-    - stock: Available quantity
+    - stock: Available quantity (cached total when the product is sharded)
+    - stock_shards: Number of stock shards, 0 = stock lives in this row only
     - category: Product category (electronics, clothing, etc.)
     - image_url: Product image URL (optional)
     - created_by: Admin user who created the product
@@ -19,12 +20,17 @@ class Product(db.Model):
     """
     
     __tablename__ = 'products'
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id) - see get_products_page
+        db.Index('ix_products_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False, index=True)
     description = db.Column(db.Text)
     price = db.Column(db.Float, nullable=False)
     stock = db.Column(db.Integer, default=0, nullable=False)
+    stock_shards = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     category = db.Column(db.String(50), index=True)
     image_url = db.Column(db.String(255))
     
@@ -32,11 +38,15 @@ class Product(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationship: Product belongs to a user (admin)
     creator = db.relationship('User', backref='products')
     
+    # Relationship: Product has stock shards (only when stock_shards > 0)
+    shards = db.relationship('StockShard', lazy=True, cascade='all, delete-orphan',
+                             order_by='StockShard.shard')
+    
     def __repr__(self):
         return f'<Product {self.name}>'
     
@@ -55,6 +65,34 @@ class Product(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
+    @classmethod
+    def row_columns(cls):
+        """Columns selected for ORM-free reads, in to_dict() order"""
+        return (
+            cls.id, cls.name, cls.description, cls.price, cls.stock, cls.category,
+            cls.image_url, cls.created_by, cls.created_at, cls.updated_at
+        )
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Same output as to_dict() for a row selected with row_columns()"""
+        (product_id, name, description, price, stock, category,
+         image_url, created_by, created_at, updated_at) = row
+        return {
+            'id': product_id,
+            'name': name,
+            'description': description,
+            'price': price,
+            'stock': stock,
+            'category': category,
+            'image_url': image_url,
+            'created_by': created_by,
+            'created_at': created_at.isoformat(),
+            'updated_at': updated_at.isoformat()
+        }
+    
     def is_in_stock(self):
-        """Check if product is available"""
-        return self.stock > 0
\ No newline at end of file
+        """Check if product is available (sharded products ask their shards)"""
+        if self.stock_shards:
+            return any(shard.stock > 0 for shard in self.shards)
+        return self.stock > 0
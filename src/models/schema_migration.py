@@ -0,0 +1,19 @@
+from src.database import db
+from datetime import datetime
+
+class SchemaMigration(db.Model):
+    """
+    SchemaMigration Model - One row per applied migration (src/migrations.py)
+    
+    The highest version is the schema version of the database. App startup
+    only reads it; DDL runs from `python migrate.py`.
+    """
+    
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<SchemaMigration {self.version} {self.name}>'
@@ -0,0 +1,24 @@
+from src.database import db
+
+class StockShard(db.Model):
+    """
+    StockShard Model - One slice of a sharded product's stock
+    
+    Products with stock_shards > 0 keep their stock split across that many
+    rows, so concurrent checkouts decrement different rows instead of all
+    waiting on the single products row. See StockShardRepository.
+    
+    Fields:
+    - product_id: Product the shard belongs to
+    - shard: Shard number (0 .. stock_shards - 1)
+    - stock: Units held by this shard
+    """
+    
+    __tablename__ = 'product_stock_shards'
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True, autoincrement=False)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    stock = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<StockShard product_id={self.product_id} shard={self.shard} stock={self.stock}>'
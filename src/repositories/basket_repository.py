@@ -1,105 +1,212 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from src.database import db
 from src.models.basket import Basket, BasketItem
-from src.models.product import Product
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+_UPSERT_INSERTS = {
+    'sqlite': sqlite_insert,
+    'postgresql': postgresql_insert,
+}
+
 
 class BasketRepository:
     """
     Basket Repository - Handles all database operations for Baskets
+    
+    Methods never commit: the request's unit of work commits once after
+    the route succeeds (see src/middleware/unit_of_work.py).
     """
     
     @staticmethod
-    def get_active_basket(user_id):
+    def _with_items(query):
+        """
+        Eager-load basket items and their products
+        
+        Basket, items and products come back in a single SELECT (joined
+        eager loading) however many lines the basket has, instead of one
+        query per item.
+        """
+        return query.options(
+            db.joinedload(Basket.items).joinedload(BasketItem.product)
+        )
+    
+    @staticmethod
+    def get_active_basket(user_id, with_items=False):
         """Get user's active basket (current shopping cart)"""
-        return Basket.query.filter_by(user_id=user_id, status='active').first()
+        query = Basket.query.filter_by(user_id=user_id, status='active')
+        if with_items:
+            query = BasketRepository._with_items(query)
+        return query.first()
     
     @staticmethod
     def create_basket(user_id):
-        """Create a new active basket for user"""
+        """Create a new active basket for user (flushed, not committed)"""
         basket = Basket(user_id=user_id, status='active')
+        basket.items = []
         db.session.add(basket)
-        db.session.commit()
+        db.session.flush()
         return basket
     
     @staticmethod
-    def get_or_create_basket(user_id):
+    def get_or_create_basket(user_id, with_items=False):
         """Get active basket or create if doesn't exist"""
-        basket = BasketRepository.get_active_basket(user_id)
+        basket = BasketRepository.get_active_basket(user_id, with_items=with_items)
         if not basket:
             basket = BasketRepository.create_basket(user_id)
         return basket
     
     @staticmethod
-    def add_item(basket_id, product_id, quantity=1):
+    def touch(basket):
+        """Record activity on the basket (item changes don't update the basket row)"""
+        basket.updated_at = datetime.utcnow()
+    
+    @staticmethod
+    def find_item(basket, product_id):
+        """Find the basket line for a product in the loaded items (no query)"""
+        for item in basket.items:
+            if item.product_id == product_id:
+                return item
+        return None
+    
+    @staticmethod
+    def _upsert_items(basket_id, quantities):
+        """
+        Add quantities to basket lines in one statement, creating missing ones
+        
+        Relies on the unique (basket_id, product_id) index, so concurrent
+        adds of the same product add up on one line instead of duplicating it.
+        
+        Returns:
+            Rows (id, product_id, quantity, added_at) after the write
+        """
+        insert = _UPSERT_INSERTS[db.engine.dialect.name]
+        statement = insert(BasketItem).values([
+            {'basket_id': basket_id, 'product_id': product_id, 'quantity': quantity}
+            for product_id, quantity in quantities.items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[BasketItem.basket_id, BasketItem.product_id],
+            set_={'quantity': BasketItem.quantity + statement.excluded.quantity}
+        ).returning(BasketItem.id, BasketItem.product_id, BasketItem.quantity, BasketItem.added_at)
+        return db.session.execute(statement).all()
+    
+    @staticmethod
+    def add_items(basket, quantities):
+        """
+        Add several products to the basket, adding to lines that exist
+        
+        On SQLite/PostgreSQL this is a single multi-row
+        INSERT ... ON CONFLICT DO UPDATE (atomic, no lost updates); the
+        loaded basket.items is synced from the returned rows without another
+        query. Other databases fall back to updating the loaded lines in
+        Python and one flush.
+        
+        Args:
+            quantities: {product_id: quantity to add}
+        
+        Returns:
+            {product_id: BasketItem}
+        """
+        if not quantities:
+            return {}
+        
+        existing = {product_id: BasketRepository.find_item(basket, product_id) for product_id in quantities}
+        BasketRepository.touch(basket)
+        
+        items = {}
+        if db.engine.dialect.name not in _UPSERT_INSERTS:
+            for product_id, quantity in quantities.items():
+                item = existing[product_id]
+                if item:
+                    item.quantity += quantity
+                else:
+                    item = BasketItem(product_id=product_id, quantity=quantity)
+                    basket.items.append(item)
+                items[product_id] = item
+            # New lines get their IDs for the response
+            db.session.flush()
+            return items
+        
+        new_items = []
+        for row in BasketRepository._upsert_items(basket.id, quantities):
+            item = existing[row.product_id]
+            if item:
+                set_committed_value(item, 'quantity', row.quantity)
+            else:
+                # The row exists already: attach it as a persistent object, no INSERT on flush
+                item = BasketItem(
+                    id=row.id,
+                    basket_id=basket.id,
+                    product_id=row.product_id,
+                    quantity=row.quantity,
+                    added_at=row.added_at
+                )
+                make_transient_to_detached(item)
+                db.session.add(item)
+                new_items.append(item)
+            items[row.product_id] = item
+        
+        if new_items:
+            set_committed_value(basket, 'items', list(basket.items) + new_items)
+        return items
+    
+    @staticmethod
+    def add_item(basket, product_id, quantity=1, existing_item=None):
         """
-        Add item to basket or update quantity if already exists
+        Add item to basket or update quantity if already exists (see add_items)
+        
+        Pass existing_item if the caller already looked it up with find_item().
         
         Returns:
             (basket_item, created) tuple
             - basket_item: The BasketItem object
             - created: True if new item, False if updated existing
         """
-        # Check if item already exists in basket
-        existing_item = BasketItem.query.filter_by(
-            basket_id=basket_id,
-            product_id=product_id
-        ).first()
-        
-        if existing_item:
-            # Update quantity
-            existing_item.quantity += quantity
-            db.session.commit()
-            return existing_item, False
-        else:
-            # Create new item
-            item = BasketItem(
-                basket_id=basket_id,
-                product_id=product_id,
-                quantity=quantity
-            )
-            db.session.add(item)
-            db.session.commit()
-            return item, True
-    
-    @staticmethod
-    def update_item_quantity(basket_id, product_id, quantity):
+        if existing_item is None:
+            existing_item = BasketRepository.find_item(basket, product_id)
+        
+        item = BasketRepository.add_items(basket, {product_id: quantity})[product_id]
+        return item, existing_item is None
+    
+    @staticmethod
+    def update_item_quantity(basket, product_id, quantity):
         """Update quantity of item in basket"""
-        item = BasketItem.query.filter_by(
-            basket_id=basket_id,
-            product_id=product_id
-        ).first()
+        item = BasketRepository.find_item(basket, product_id)
         
         if not item:
             return None
         
+        BasketRepository.touch(basket)
+        
         if quantity <= 0:
-            # Remove item if quantity is 0 or negative
-            db.session.delete(item)
+            # Remove item if quantity is 0 or negative (delete-orphan cascade)
+            basket.items.remove(item)
         else:
             item.quantity = quantity
         
-        db.session.commit()
         return item
     
     @staticmethod
-    def remove_item(basket_id, product_id):
+    def remove_item(basket, product_id):
         """Remove item from basket"""
-        item = BasketItem.query.filter_by(
-            basket_id=basket_id,
-            product_id=product_id
-        ).first()
+        item = BasketRepository.find_item(basket, product_id)
         
         if not item:
             return False
         
-        db.session.delete(item)
-        db.session.commit()
+        BasketRepository.touch(basket)
+        basket.items.remove(item)
         return True
     
     @staticmethod
-    def clear_basket(basket_id):
+    def clear_basket(basket):
         """Remove all items from basket"""
-        BasketItem.query.filter_by(basket_id=basket_id).delete()
-        db.session.commit()
+        BasketRepository.touch(basket)
+        basket.items.clear()
         return True
     
     @staticmethod
@@ -108,14 +215,25 @@ class BasketRepository:
         return Basket.query.get(basket_id)
     
     @staticmethod
-    def complete_basket(basket_id):
-        """Mark basket as completed (checkout)"""
-        basket = Basket.query.get(basket_id)
-        if basket:
-            basket.status = 'completed'
-            db.session.commit()
-            return True
-        return False
+    def complete_and_renew(basket):
+        """
+        Mark basket as completed and open a new active one (checkout)
+        
+        Call after OrderRepository.create_from_basket: the completed basket's
+        lines are deleted, the order snapshot holds them from now on, so
+        they no longer pin products that an admin later deletes.
+        Does not commit, so checkout can finish in a single transaction.
+        
+        Returns:
+            The new active basket (flushed, so it has an ID)
+        """
+        basket.items.clear()
+        basket.status = 'completed'
+        new_basket = Basket(user_id=basket.user_id, status='active')
+        new_basket.items = []
+        db.session.add(new_basket)
+        db.session.flush()
+        return new_basket
     
     @staticmethod
     def get_user_baskets(user_id, status=None):
@@ -131,4 +249,54 @@ class BasketRepository:
         if status:
             query = query.filter_by(status=status)
         
-        return query.order_by(Basket.created_at.desc()).all()
\ No newline at end of file
+        return query.order_by(Basket.created_at.desc()).all()
+    
+    @staticmethod
+    def abandon_stale(cutoff, limit=500):
+        """
+        Mark up to `limit` active baskets untouched since `cutoff` as abandoned
+        
+        Returns:
+            Number of baskets marked
+        """
+        stale_ids = (
+            db.select(Basket.id)
+            .where(Basket.status == 'active', Basket.updated_at < cutoff)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            db.update(Basket)
+            .where(Basket.id.in_(stale_ids), Basket.status == 'active')
+            .values(status='abandoned', updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    @staticmethod
+    def purge_abandoned(cutoff, limit=500):
+        """
+        Delete up to `limit` baskets abandoned before `cutoff`, with their items
+        
+        Returns:
+            (baskets_deleted, items_deleted) tuple
+        """
+        basket_ids = db.session.execute(
+            db.select(Basket.id)
+            .where(Basket.status == 'abandoned', Basket.updated_at < cutoff)
+            .limit(limit)
+        ).scalars().all()
+        if not basket_ids:
+            return 0, 0
+        
+        items = db.session.execute(
+            db.delete(BasketItem)
+            .where(BasketItem.basket_id.in_(basket_ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        baskets = db.session.execute(
+            db.delete(Basket)
+            .where(Basket.id.in_(basket_ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return baskets, items
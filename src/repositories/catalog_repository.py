@@ -0,0 +1,43 @@
+from datetime import datetime
+from src.database import db
+from src.models.catalog import CatalogVersion
+from src.models.product import Product
+
+CATALOG_ROW_ID = 1
+
+
+class CatalogRepository:
+    """Repository for the catalog version counter"""
+    
+    @staticmethod
+    def get_validator():
+        """
+        (version, last product write) pair, moved by every catalog change
+        
+        The version covers deletes and bulk writes; MAX(products.updated_at),
+        an index lookup, covers every product row write, including stock
+        taken by checkouts. One query.
+        """
+        last_write = db.select(db.func.max(Product.updated_at)).scalar_subquery()
+        row = db.session.execute(
+            db.select(CatalogVersion.version, last_write).where(CatalogVersion.id == CATALOG_ROW_ID)
+        ).first()
+        return tuple(row) if row else (0, None)
+    
+    @staticmethod
+    def bump_version():
+        """
+        Increment the catalog version
+        
+        Runs in the caller's transaction (no commit) so the bump becomes
+        visible together with the product change it describes. The row is
+        seeded by a migration, so this is always a single UPDATE.
+        
+        Every bump writes one shared row, so checkouts don't bump: their
+        stock changes move products.updated_at (see get_validator).
+        """
+        db.session.execute(
+            db.update(CatalogVersion)
+            .where(CatalogVersion.id == CATALOG_ROW_ID)
+            .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow())
+        )
@@ -0,0 +1,118 @@
+from datetime import datetime
+from sqlalchemy import event, inspect
+from src.database import db
+from src.models.category import Category
+from src.models.product import Product
+
+
+def _adjust(connection, name, products=0, in_stock=0):
+    """Apply count deltas to one category row, creating it if needed"""
+    if not name or (products == 0 and in_stock == 0):
+        return
+    
+    table = Category.__table__
+    result = connection.execute(
+        table.update()
+        .where(table.c.name == name)
+        .values(
+            product_count=table.c.product_count + products,
+            in_stock_count=table.c.in_stock_count + in_stock,
+            updated_at=datetime.utcnow()
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            table.insert().values(
+                name=name,
+                product_count=max(products, 0),
+                in_stock_count=max(in_stock, 0),
+                updated_at=datetime.utcnow()
+            )
+        )
+
+
+def _history_old_new(state, key):
+    """(old, new) values of an attribute during a flush"""
+    history = state.attrs[key].history
+    new = history.added[0] if history.added else getattr(state.object, key)
+    old = history.deleted[0] if history.deleted else new
+    return old, new
+
+
+@event.listens_for(Product, 'after_insert')
+def _product_inserted(mapper, connection, target):
+    _adjust(connection, target.category, 1, 1 if target.stock > 0 else 0)
+
+
+@event.listens_for(Product, 'after_delete')
+def _product_deleted(mapper, connection, target):
+    _adjust(connection, target.category, -1, -1 if target.stock > 0 else 0)
+
+
+@event.listens_for(Product, 'after_update')
+def _product_updated(mapper, connection, target):
+    state = inspect(target)
+    old_category, new_category = _history_old_new(state, 'category')
+    old_stock, new_stock = _history_old_new(state, 'stock')
+    was_in_stock = 1 if old_stock > 0 else 0
+    is_in_stock = 1 if new_stock > 0 else 0
+    
+    if old_category != new_category:
+        _adjust(connection, old_category, -1, -was_in_stock)
+        _adjust(connection, new_category, 1, is_in_stock)
+    else:
+        _adjust(connection, new_category, 0, is_in_stock - was_in_stock)
+
+
+class CategoryRepository:
+    """
+    Repository for the materialized categories table
+    
+    ORM writes to Product keep the counts in sync through mapper events.
+    Code that changes products with bulk/raw SQL must call adjust() with
+    the deltas it caused, in the same transaction. recount() rebuilds the
+    counts from products (recount_categories.py) should they ever drift.
+    """
+    
+    @staticmethod
+    def get_categories():
+        """All categories that currently have products, by name"""
+        return Category.query.filter(Category.product_count > 0).order_by(Category.name).all()
+    
+    @staticmethod
+    def adjust(name, products=0, in_stock=0):
+        """Apply count deltas for writes that bypass the ORM (no commit)"""
+        _adjust(db.session.connection(), name, products, in_stock)
+    
+    @staticmethod
+    def recount(names=None):
+        """
+        Recompute counts from the products table
+        
+        Args:
+            names: Categories to recompute (None = all of them)
+        
+        Does not commit; the caller owns the transaction.
+        """
+        counts = db.session.query(
+            Product.category,
+            db.func.count(Product.id),
+            db.func.sum(db.case((Product.stock > 0, 1), else_=0))
+        ).filter(Product.category.isnot(None))
+        
+        categories = Category.query
+        if names is not None:
+            names = [n for n in set(names) if n]
+            if not names:
+                return
+            counts = counts.filter(Product.category.in_(names))
+            categories = categories.filter(Category.name.in_(names))
+        
+        rows = {name: (total, in_stock or 0) for name, total, in_stock in counts.group_by(Product.category)}
+        existing = {c.name: c for c in categories}
+        
+        for name, category in existing.items():
+            category.product_count, category.in_stock_count = rows.pop(name, (0, 0))
+        
+        for name, (total, in_stock) in rows.items():
+            db.session.add(Category(name=name, product_count=total, in_stock_count=in_stock))
@@ -0,0 +1,89 @@
+from datetime import datetime
+from src.database import db
+from src.models.order import Order, OrderLine
+
+
+class OrderRepository:
+    """
+    Order Repository - Order snapshots written at checkout
+    
+    Reads never touch baskets or products.
+    """
+    
+    @staticmethod
+    def create_from_basket(basket, completed_at=None):
+        """
+        Snapshot a basket (items and products loaded) as an order
+        
+        Lines with the same product are merged and written with a single
+        executemany (no per-row INSERT ... RETURNING); order.lines loads
+        them on first access. Does not commit.
+        """
+        lines = {}
+        for item in basket.items:
+            line = lines.get(item.product_id)
+            if line:
+                line['quantity'] += item.quantity
+            else:
+                product = item.product
+                lines[item.product_id] = {
+                    'order_id': basket.id,
+                    'product_id': item.product_id,
+                    'product_name': product.name if product else f'Product #{item.product_id}',
+                    'unit_price': product.price if product else 0,
+                    'quantity': item.quantity
+                }
+        
+        for line in lines.values():
+            line['subtotal'] = line['unit_price'] * line['quantity']
+        
+        order = Order(
+            id=basket.id,
+            user_id=basket.user_id,
+            total_items=len(lines),
+            total_quantity=sum(line['quantity'] for line in lines.values()),
+            total_price=sum(line['subtotal'] for line in lines.values()),
+            created_at=basket.created_at,
+            completed_at=completed_at or datetime.utcnow()
+        )
+        db.session.add(order)
+        db.session.flush()
+        
+        if lines:
+            db.session.execute(db.insert(OrderLine), list(lines.values()))
+        return order
+    
+    @staticmethod
+    def get_order_summaries(user_id, after=None, limit=20):
+        """
+        User's orders newest first (keyset pagination), without lines
+        
+        Args:
+            after: (created_at, id) of the last order on the previous page
+            limit: Page size
+        
+        Returns:
+            (orders, has_next) tuple
+        """
+        query = Order.query.filter_by(user_id=user_id)
+        
+        if after:
+            created_at, order_id = after
+            query = query.filter(
+                db.or_(
+                    Order.created_at < created_at,
+                    db.and_(Order.created_at == created_at, Order.id < order_id)
+                )
+            )
+        
+        orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+        return orders[:limit], len(orders) > limit
+    
+    @staticmethod
+    def get_order(user_id, order_id):
+        """Get one of the user's orders with its lines"""
+        return (
+            Order.query.options(db.selectinload(Order.lines))
+            .filter_by(id=order_id, user_id=user_id)
+            .first()
+        )
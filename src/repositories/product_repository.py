@@ -1,8 +1,19 @@
+from datetime import datetime
+from sqlalchemy.orm.attributes import set_committed_value
 from src.database import db
+from src.models.basket import BasketItem
 from src.models.product import Product
+from src.repositories.catalog_repository import CatalogRepository
+from src.repositories.category_repository import CategoryRepository
+from src.repositories.search_repository import SearchRepository
+from src.repositories.stock_shard_repository import StockShardRepository
 
 class ProductRepository:
-    """Repository for Product model - handles DB operations"""
+    """
+    Repository for Product model - handles DB operations
+    
+    Writes are flushed, not committed; the request's unit of work commits.
+    """
     
 
     @staticmethod
@@ -18,7 +29,8 @@ class ProductRepository:
             created_by=created_by
         )
         db.session.add(new_product)
-        db.session.commit()
+        CatalogRepository.bump_version()
+        db.session.flush()
         return new_product
     
     @staticmethod
@@ -27,24 +39,117 @@ class ProductRepository:
         return Product.query.get(product_id)
     
     @staticmethod
-    def get_all_products(page=1, per_page=10 , category=None, search=None):
-        """Retrieve all products with optional pagination, category filter, and search"""
-        query = Product.query
+    def get_products_by_ids(product_ids):
+        """Retrieve several products with one IN query, as {id: product}"""
+        if not product_ids:
+            return {}
+        products = Product.query.filter(Product.id.in_(set(product_ids))).all()
+        return {p.id: p for p in products}
+    
+    @staticmethod
+    def _select_product_rows(category=None, search=None, rank=True):
+        """
+        SELECT of Product.row_columns() with the listing filters applied
+        
+        Returns:
+            (select, ranked) tuple - ranked as in SearchRepository.apply_search
+        """
+        query = db.select(*Product.row_columns())
         
         if category:
-            query = query.filter_by(category=category)
+            query = query.where(Product.category == category)
         
+        ranked = False
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
+            query, ranked = SearchRepository.apply_search(query, Product, search, rank=rank)
+        
+        return query, ranked
+    
+    @staticmethod
+    def _count(query):
+        """COUNT(*) of a SELECT's result"""
+        return db.session.execute(
+            db.select(db.func.count()).select_from(query.order_by(None).subquery())
+        ).scalar()
+    
+    @staticmethod
+    def get_product_rows(page=1, per_page=10, category=None, search=None):
+        """
+        Read-only fast path for the product listing
+        
+        Selects plain column tuples (see Product.row_columns) instead of
+        hydrating ORM objects, skipping identity-map and attribute
+        bookkeeping.
+        
+        Returns:
+            (rows, total) tuple
+        """
+        query, ranked = ProductRepository._select_product_rows(category, search)
+        
+        if not ranked:
+            # id breaks ties: a bulk import gives a whole chunk one created_at
+            query = query.order_by(Product.created_at.desc(), Product.id.desc())
+        
+        total = ProductRepository._count(query)
+        rows = db.session.execute(
+            query.limit(per_page).offset((page - 1) * per_page)
+        ).all()
+        return rows, total
+    
+    @staticmethod
+    def get_products_page(after=None, limit=10, category=None, search=None, with_total=False):
+        """
+        Keyset (cursor) pagination, newest first
+        
+        Seeks past the (created_at, id) position instead of using OFFSET,
+        so every page costs the same no matter how deep it is. Returns
+        column tuples (see Product.row_columns), not ORM objects.
+        
+        Args:
+            after: (created_at, id) of the last product on the previous page
+            limit: Page size
+            with_total: Also run COUNT(*) for the filtered catalog
+        
+        Returns:
+            (rows, has_next, total) tuple - total is None unless requested
+        """
+        query, _ = ProductRepository._select_product_rows(category, search, rank=False)
+        
+        total = ProductRepository._count(query) if with_total else None
+        
+        if after:
+            created_at, product_id = after
+            query = query.where(
                 db.or_(
-                    Product.name.ilike(search_pattern),
-                    Product.description.ilike(search_pattern)
+                    Product.created_at < created_at,
+                    db.and_(Product.created_at == created_at, Product.id < product_id)
                 )
             )
-        query = query.order_by(Product.created_at.desc())
-
-        return query.paginate(page=page, per_page=per_page, error_out=False)
+        
+        # Fetch one extra row to know if there is a next page
+        rows = db.session.execute(
+            query.order_by(Product.created_at.desc(), Product.id.desc()).limit(limit + 1)
+        ).all()
+        return rows[:limit], len(rows) > limit, total
+    
+    @staticmethod
+    def iter_product_rows(updated_since=None, chunk_size=1000):
+        """
+        Stream every product as a column tuple (see Product.row_columns)
+        
+        Rows are fetched chunk_size at a time (yield_per) and never become
+        ORM objects, so memory use does not grow with the catalog.
+        
+        Args:
+            updated_since: Only products updated at or after this datetime
+        """
+        query = db.select(*Product.row_columns())
+        if updated_since:
+            query = query.where(Product.updated_at >= updated_since)
+        
+        return db.session.execute(
+            query.order_by(Product.id).execution_options(yield_per=chunk_size)
+        )
     
     @staticmethod
     def update_product(product_id, **kwargs):
@@ -53,26 +158,186 @@ class ProductRepository:
         if not product:
             return None
         
+        # Stock of a sharded product is redistributed over its shards
+        shards = kwargs.pop('stock_shards', None)
+        if shards is not None or (product.stock_shards and 'stock' in kwargs):
+            StockShardRepository.reshard(
+                product,
+                product.stock_shards if shards is None else shards,
+                total=kwargs.pop('stock', None)
+            )
+        
         for key, value in kwargs.items():
             if hasattr(product, key):
                 setattr(product, key, value)
         
-        db.session.commit()
+        CatalogRepository.bump_version()
+        db.session.flush()
         return product
     
     @staticmethod
     def delete_product(product_id):
-        """Delete a product by its ID"""
+        """
+        Delete a product by its ID
+        
+        Its lines in active and abandoned baskets are removed first (one
+        DELETE); orders keep their own snapshot of the product.
+        """
         product = ProductRepository.get_product_by_id(product_id)
         if not product:
             return False
         
+        db.session.execute(db.delete(BasketItem).where(BasketItem.product_id == product_id))
         db.session.delete(product)
-        db.session.commit()
+        CatalogRepository.bump_version()
+        db.session.flush()
         return True
     
+    @staticmethod
+    def bulk_save(rows, created_by, upsert=False):
+        """
+        Insert a chunk of validated products with executemany
+        
+        Args:
+            rows: Dicts from ProductService.validate_product
+            created_by: Admin user ID for new products
+            upsert: Update products that already exist with the same name
+                    instead of inserting a duplicate
+        
+        Bulk statements skip mapper events, so category counts and the
+        catalog version are updated here. Rows may carry their own
+        created_at/updated_at (seeded data); otherwise now is used.
+        Does not commit.
+        
+        Returns:
+            (created, updated) counts
+        """
+        now = datetime.utcnow()
+        existing = {}
+        
+        if upsert:
+            # Later rows win when a chunk names the same product twice
+            rows = list({row['name']: row for row in rows}.values())
+            existing = {
+                name: (product_id, category, stock, shards)
+                for name, product_id, category, stock, shards in db.session.execute(
+                    db.select(Product.name, Product.id, Product.category, Product.stock, Product.stock_shards)
+                    .where(Product.name.in_([row['name'] for row in rows]))
+                )
+            }
+        
+        inserts = []
+        updates = []
+        resharded = {}
+        category_deltas = {}
+        
+        def count(category, products, in_stock):
+            if category:
+                total, stocked = category_deltas.get(category, (0, 0))
+                category_deltas[category] = (total + products, stocked + in_stock)
+        
+        for row in rows:
+            in_stock = 1 if row['stock'] > 0 else 0
+            match = existing.get(row['name'])
+            
+            if match:
+                product_id, old_category, old_stock, shards = match
+                updates.append({'updated_at': now, **row, 'id': product_id})
+                if shards:
+                    resharded[product_id] = (row['stock'], shards)
+                count(old_category, -1, -(1 if old_stock > 0 else 0))
+            else:
+                inserts.append({'created_at': now, 'updated_at': now, **row, 'created_by': created_by})
+            
+            count(row['category'], 1, in_stock)
+        
+        if inserts:
+            db.session.execute(db.insert(Product), inserts)
+        if updates:
+            db.session.execute(db.update(Product), updates)
+            StockShardRepository.reshard_many(resharded)
+        
+        for category, (products, in_stock) in category_deltas.items():
+            CategoryRepository.adjust(category, products, in_stock)
+        
+        CatalogRepository.bump_version()
+        return len(inserts), len(updates)
+    
+    @staticmethod
+    def reserve_stock(quantities, loaded_products=None):
+        """
+        Decrement stock for several products with one guarded UPDATE
+        
+            UPDATE products SET stock = stock - CASE id WHEN .. THEN .. END
+            WHERE id IN (..) AND stock >= CASE id WHEN .. THEN .. END
+        
+        The database checks and decrements in the same statement, so two
+        concurrent checkouts can never both take the last unit.
+        Does NOT commit - on failure the caller must roll back, since the
+        lines that did have enough stock were already decremented.
+        Products with stock shards are decremented through
+        StockShardRepository; their stock is the real (summed) total.
+        
+        Args:
+            quantities: {product_id: quantity} (quantities > 0)
+            loaded_products: Product objects already in the session; their
+                             stock is refreshed without reloading them
+        
+        Returns:
+            (ok, stock) tuple
+            - ok: True if every line was decremented
+            - stock: {product_id: stock} as seen after the UPDATE
+        """
+        # Sharded products take their stock from shard rows instead
+        loaded = {product.id: product for product in loaded_products or ()}
+        unknown = [product_id for product_id in quantities if product_id not in loaded]
+        sharded = {product_id for product_id, product in loaded.items() if product.stock_shards}
+        if unknown:
+            sharded.update(db.session.execute(
+                db.select(Product.id).where(Product.id.in_(unknown), Product.stock_shards > 0)
+            ).scalars())
+        
+        ids = [product_id for product_id in quantities if product_id not in sharded]
+        ok = True
+        stock = {}
+        
+        if ids:
+            requested = db.case({product_id: quantities[product_id] for product_id in ids}, value=Product.id)
+            result = db.session.execute(
+                db.update(Product)
+                .where(Product.id.in_(ids), Product.stock >= requested)
+                .values(stock=Product.stock - requested, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            
+            rows = db.session.execute(
+                db.select(Product.id, Product.stock, Product.category).where(Product.id.in_(ids))
+            ).all()
+            stock = {product_id: product_stock for product_id, product_stock, _ in rows}
+            
+            ok = result.rowcount == len(ids)
+            if ok:
+                # Raw UPDATE bypasses mapper events: keep in-stock counts right.
+                # updated_at moves the catalog ETags, no version bump needed.
+                for _, product_stock, category in rows:
+                    if product_stock == 0:
+                        CategoryRepository.adjust(category, in_stock=-1)
+        
+        if sharded and ok:
+            ok, totals = StockShardRepository.reserve({product_id: quantities[product_id] for product_id in sharded})
+            stock.update(totals)
+        elif sharded:
+            # Not attempted, but the shortfall report needs their real stock
+            stock.update(StockShardRepository.get_totals(sharded))
+        
+        if ok:
+            for product in loaded.values():
+                if product.id in stock:
+                    set_committed_value(product, 'stock', stock[product.id])
+        
+        return ok, stock
+    
     @staticmethod
     def get_categories():
-        """Retrieve distinct product categories"""
-        categories = db.session.query(Product.category).distinct().all()
-        return [c[0] for c in categories if c[0]]  # Extract category names from tuples
\ No newline at end of file
+        """Retrieve product categories (from the materialized categories table)"""
+        return CategoryRepository.get_categories()
\ No newline at end of file
@@ -0,0 +1,158 @@
+import re
+import weakref
+from sqlalchemy.exc import DBAPIError
+from src.database import db
+
+# FTS5 index over products.name/description. It is an "external content"
+# table: the text lives in `products`, triggers keep the index in sync on
+# every INSERT/UPDATE/DELETE (ORM or raw SQL alike).
+SEARCH_TABLE = 'products_fts'
+
+_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+_fts_table = db.table(SEARCH_TABLE, db.column('rowid'), db.column('rank'))
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# engine -> whether its SQLite build has the FTS5 module (probed once)
+_fts5_available = weakref.WeakKeyDictionary()
+
+
+class SearchRepository:
+    """
+    Search Repository - Full-text product search
+
+    Uses an SQLite FTS5 index when the database supports it. Other
+    databases (or a missing FTS5 module) fall back to ILIKE matching.
+    """
+
+    @staticmethod
+    def is_enabled():
+        """Check if the full-text index can be used on the current database"""
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return False
+
+        available = _fts5_available.get(engine)
+        if available is None:
+            # FTS5 is a compile-time option: try it on a throwaway temp table
+            try:
+                with engine.connect() as conn:
+                    conn.exec_driver_sql('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+                    conn.exec_driver_sql('DROP TABLE temp.fts5_probe')
+                available = True
+            except DBAPIError:
+                available = False
+            _fts5_available[engine] = available
+        return available
+
+    @staticmethod
+    def create_index():
+        """Create the FTS table and its sync triggers (idempotent)"""
+        if not SearchRepository.is_enabled():
+            return False
+
+        with db.engine.begin() as conn:
+            for statement in _SEARCH_DDL:
+                conn.exec_driver_sql(statement)
+        return True
+
+    @staticmethod
+    def rebuild_index():
+        """
+        Rebuild the index from the products table
+
+        Needed once for catalogs that existed before the index was created.
+
+        Returns:
+            Number of products indexed, or None if search index is disabled
+        """
+        if not SearchRepository.create_index():
+            return None
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+            )
+            return conn.exec_driver_sql("SELECT COUNT(*) FROM products").scalar()
+
+    @staticmethod
+    def build_match_expression(search):
+        """
+        Turn free text into an FTS5 MATCH expression
+
+        Every word becomes a quoted prefix term, so "iph pro" matches
+        "iPhone 15 Pro". Returns None if the text has no searchable words.
+        """
+        terms = _TERM_RE.findall(search or '')
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    @staticmethod
+    def apply_search(query, model, search, rank=True):
+        """
+        Filter a Product query by search text
+
+        Args:
+            rank: Order full-text matches by relevance. Pass False when the
+                  caller needs its own stable ordering (keyset pagination).
+
+        Returns:
+            (query, ranked) tuple
+            - query: filtered query
+            - ranked: True if the query is already ordered by relevance
+        """
+        match = SearchRepository.build_match_expression(search)
+
+        if match and SearchRepository.is_enabled():
+            matches = (
+                db.select(
+                    _fts_table.c.rowid.label('product_id'),
+                    _fts_table.c.rank.label('rank')
+                )
+                .where(db.text(f'{SEARCH_TABLE} MATCH :match').bindparams(match=match))
+                .subquery()
+            )
+            query = query.join(matches, model.id == matches.c.product_id)
+            if not rank:
+                return query, False
+            return query.order_by(matches.c.rank, model.id.desc()), True
+
+        search_pattern = f"%{search}%"
+        query = query.filter(
+            db.or_(
+                model.name.ilike(search_pattern),
+                model.description.ilike(search_pattern)
+            )
+        )
+        return query, False
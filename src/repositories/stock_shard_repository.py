@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.database import db
+from src.models.product import Product
+from src.models.stock_shard import StockShard
+from src.repositories.category_repository import CategoryRepository
+
+MAX_STOCK_SHARDS = 64
+
+# product_id -> monotonic time products.stock was last synced by this process
+_last_sync = {}
+_last_sync_lock = threading.Lock()
+
+# session.info key: {product_id: (previous, stamp)} for syncs not committed yet
+_PENDING_SYNCS = 'stock_shard_pending_syncs'
+
+
+@event.listens_for(Session, 'after_commit')
+def _keep_synced(session):
+    session.info.pop(_PENDING_SYNCS, None)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_unsynced(session, transaction):
+    # Rolled back (or closed without commit): products.stock was not written,
+    # so the next checkout must not be throttled by this attempt
+    if transaction.parent is not None:
+        return
+    pending = session.info.pop(_PENDING_SYNCS, None)
+    if not pending:
+        return
+    with _last_sync_lock:
+        for product_id, (previous, stamp) in pending.items():
+            if _last_sync.get(product_id) != stamp:
+                continue
+            if previous is None:
+                _last_sync.pop(product_id, None)
+            else:
+                _last_sync[product_id] = previous
+
+
+def _split(total, shards):
+    """Spread total over shards as evenly as possible"""
+    size, extra = divmod(total, shards)
+    return [size + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+class StockShardRepository:
+    """
+    Repository for sharded stock counters (flash-sale products)
+    
+    A sharded product's real stock is the sum of its shard rows.
+    products.stock is kept as a cached total for listings and filters: it is
+    refreshed by checkouts at most every STOCK_SHARD_SYNC_INTERVAL seconds
+    per process, and immediately when the product sells out.
+    
+    Writes are flushed, not committed; the request's unit of work commits.
+    """
+    
+    @staticmethod
+    def get_totals(product_ids):
+        """Real stock of sharded products, as {product_id: total} (one GROUP BY query)"""
+        if not product_ids:
+            return {}
+        rows = db.session.execute(
+            db.select(StockShard.product_id, db.func.sum(StockShard.stock))
+            .where(StockShard.product_id.in_(list(product_ids)))
+            .group_by(StockShard.product_id)
+        )
+        return {product_id: total or 0 for product_id, total in rows}
+    
+    @staticmethod
+    def reshard(product, shards, total=None):
+        """
+        Split a product's stock across `shards` rows (0 turns sharding off)
+        
+        Args:
+            product: Product to (re)shard
+            shards: Number of shards, 0..MAX_STOCK_SHARDS
+            total: New total stock (default: the product's current real stock)
+        
+        Locks the product row (unsharded checkouts update it) and the shard
+        rows (sharded checkouts update those) before reading the current
+        total, so no checkout can commit between the read and the rewrite.
+        """
+        stock, current_shards = db.session.execute(
+            db.select(Product.stock, Product.stock_shards)
+            .where(Product.id == product.id)
+            .with_for_update()
+        ).one()
+        shard_stock = db.session.execute(
+            db.select(StockShard.stock)
+            .where(StockShard.product_id == product.id)
+            .with_for_update()
+        ).scalars().all()
+        
+        if total is None:
+            total = sum(shard_stock) if current_shards else stock
+        
+        product.stock = total
+        product.stock_shards = shards
+        product.shards = [
+            StockShard(shard=shard, stock=stock)
+            for shard, stock in enumerate(_split(total, shards))
+        ] if shards else []
+        db.session.flush()
+    
+    @staticmethod
+    def reshard_many(totals):
+        """
+        Re-split several products after a bulk write of products.stock
+        
+        Args:
+            totals: {product_id: (stock, shards)}
+        """
+        if not totals:
+            return
+        db.session.execute(
+            db.delete(StockShard).where(StockShard.product_id.in_(list(totals)))
+        )
+        rows = [
+            {'product_id': product_id, 'shard': shard, 'stock': stock}
+            for product_id, (total, shards) in totals.items()
+            for shard, stock in enumerate(_split(total, shards))
+        ]
+        if rows:
+            db.session.execute(db.insert(StockShard), rows)
+    
+    @staticmethod
+    def _take(product_id, quantity):
+        """
+        Take quantity from one product's shards
+        
+        Tries single shards starting at a random one, so concurrent
+        checkouts spread over different rows. Only when no shard can cover
+        the whole quantity does it drain several shards (largest first),
+        each with a guarded UPDATE.
+        
+        Returns:
+            True if the quantity was taken
+        """
+        rows = db.session.execute(
+            db.select(StockShard.shard, StockShard.stock).where(StockShard.product_id == product_id)
+        ).all()
+        if sum(stock for _, stock in rows) < quantity:
+            return False
+        
+        def decrement(shard, amount):
+            return db.session.execute(
+                db.update(StockShard)
+                .where(
+                    StockShard.product_id == product_id,
+                    StockShard.shard == shard,
+                    StockShard.stock >= amount
+                )
+                .values(stock=StockShard.stock - amount)
+                .execution_options(synchronize_session=False)
+            ).rowcount == 1
+        
+        start = random.randrange(len(rows))
+        for shard, stock in rows[start:] + rows[:start]:
+            if stock >= quantity and decrement(shard, quantity):
+                return True
+        
+        # Drain: the guards make a concurrent taker fail this checkout, never oversell
+        remaining = quantity
+        for shard, stock in sorted(rows, key=lambda row: -row[1]):
+            amount = min(stock, remaining)
+            if amount and not decrement(shard, amount):
+                return False
+            remaining -= amount
+            if not remaining:
+                return True
+        return False
+    
+    @staticmethod
+    def reserve(quantities):
+        """
+        Decrement sharded stock for several products
+        
+        Does NOT commit - on failure the caller must roll back, since some
+        shards may already have been decremented.
+        
+        Args:
+            quantities: {product_id: quantity} for sharded products
+        
+        Returns:
+            (ok, totals) tuple
+            - ok: True if every product had enough stock
+            - totals: {product_id: real stock} after the decrements
+        """
+        ok = True
+        for product_id, quantity in quantities.items():
+            if not StockShardRepository._take(product_id, quantity):
+                ok = False
+                break
+        
+        totals = StockShardRepository.get_totals(quantities)
+        if ok:
+            StockShardRepository.sync_cached_totals(totals)
+        return ok, totals
+    
+    @staticmethod
+    def sync_cached_totals(totals):
+        """
+        Copy real totals into products.stock, throttled per product
+        
+        Writing products.stock on every checkout would bring back the single
+        hot row, so it is written at most every STOCK_SHARD_SYNC_INTERVAL
+        seconds per process, always when a product sold out. The cached
+        value only ever goes down here; restocks go through reshard().
+        """
+        interval = current_app.config.get('STOCK_SHARD_SYNC_INTERVAL', 1.0)
+        now = time.monotonic()
+        
+        with _last_sync_lock:
+            due = {
+                product_id: total for product_id, total in totals.items()
+                if total == 0 or now - _last_sync.get(product_id, -interval) >= interval
+            }
+            # Stamped now so concurrent checkouts stay throttled; undone if
+            # this transaction does not commit (see _forget_unsynced)
+            pending = db.session.info.setdefault(_PENDING_SYNCS, {})
+            for product_id in due:
+                previous = pending[product_id][0] if product_id in pending else _last_sync.get(product_id)
+                pending[product_id] = (previous, now)
+                _last_sync[product_id] = now
+        
+        for product_id, total in due.items():
+            result = db.session.execute(
+                db.update(Product)
+                .where(Product.id == product_id, Product.stock > total)
+                .values(stock=total, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            if total == 0 and result.rowcount:
+                # Raw UPDATE bypasses mapper events: keep in-stock counts right
+                category = db.session.execute(
+                    db.select(Product.category).where(Product.id == product_id)
+                ).scalar()
+                CategoryRepository.adjust(category, in_stock=-1)
@@ -9,6 +9,8 @@ class UserRepository:
     - Single Responsibility: only deals with database
     - Easy to test
     - Easy to swap database later (SQL to MongoDB)
+    
+    Writes are flushed, not committed; the request's unit of work commits.
     """
     
     @staticmethod
@@ -20,7 +22,7 @@ class UserRepository:
             password_hash=password_hash
         )
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
         return user
     
     @staticmethod
@@ -38,6 +40,13 @@ class UserRepository:
         """Find user by ID"""
         return User.query.get(user_id)
     
+    @staticmethod
+    def update_password_hash(user, password_hash):
+        """Replace a user's stored password hash"""
+        user.password_hash = password_hash
+        db.session.flush()
+        return user
+    
     @staticmethod
     def user_exists(username=None, email=None):
         """Check if user exists by username or email"""
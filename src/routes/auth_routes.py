@@ -2,10 +2,18 @@ from flask import Blueprint, request
 from src.services.auth_service import AuthService
 from src.utils.responses import success_response, error_response
 from src.middleware.auth_middleware import jwt_required_custom
+from src.utils.password_hasher import PasswordHasherBusy
 
 # Blueprint - modular way to organize routes
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+
+def busy_response():
+    """503 returned when the password hashing queue is saturated"""
+    response, status_code = error_response("Server is busy, please try again shortly", 503)
+    response.headers['Retry-After'] = '1'
+    return response, status_code
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     """User Signup Endpoint"""
@@ -33,6 +41,8 @@ def signup():
             status_code=201
         )
         
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         return error_response(f"Server error: {str(e)}", 500)
 
@@ -62,6 +72,8 @@ def login():
             message="Login successful"
         )
         
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         return error_response(f"Server error: {str(e)}", 500)
 
@@ -1,5 +1,5 @@
-from flask import Blueprint, request
-from src.services.basket_service import BasketService
+from flask import Blueprint, request, current_app
+from src.services.basket_service import BasketService, InsufficientStockError
 from src.utils.responses import success_response, error_response
 from src.middleware.auth_middleware import jwt_required_custom
 
@@ -146,6 +146,55 @@ def clear_basket(current_user):
         return error_response(f"Server error: {str(e)}", 500)
 
 
+@basket_bp.route('/items:batch', methods=['POST'])
+@jwt_required_custom
+def batch_basket_items(current_user):
+    """
+    Apply several basket operations in one request (cart sync, reorder)
+    
+    Request Body:
+    {
+        "operations": [
+            {"product_id": 1, "quantity": 2, "op": "add"},
+            {"product_id": 2, "quantity": 5, "op": "set"},
+            {"product_id": 3, "op": "remove"}
+        ]
+    }
+    A bare JSON list of operations is accepted too.
+    
+    Response:
+    {
+        "basket": {...},
+        "applied": 2,
+        "errors": [{"index": 2, "product_id": 3, "message": "Item not found in basket"}]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        operations = data.get('operations') if isinstance(data, dict) else data
+        
+        if not operations or not isinstance(operations, list):
+            return error_response("A list of operations is required", 400)
+        
+        max_operations = current_app.config.get('BASKET_BATCH_MAX_OPERATIONS', 100)
+        if len(operations) > max_operations:
+            return error_response(f"Too many operations (max {max_operations})", 400)
+        
+        result, error = BasketService.apply_batch(current_user, operations)
+        
+        if error:
+            return error_response(error, 400)
+        
+        if result['errors'] and not result['applied']:
+            return error_response("No operations applied", 400, errors=result['errors'])
+        
+        return success_response(data=result, message=f"{result['applied']} operation(s) applied")
+        
+    except Exception as e:
+        return error_response(f"Server error: {str(e)}", 500)
+
+
 @basket_bp.route('/checkout', methods=['POST'])
 @jwt_required_custom
 def checkout(current_user):
@@ -157,6 +206,12 @@ def checkout(current_user):
     - Marks basket as completed
     - Creates new active basket
     
+    All of the above happen in one transaction. If any product is short,
+    nothing changes and a 409 lists the lines:
+    {
+        "errors": [{"product_id": 1, "name": "...", "requested": 3, "available": 1}]
+    }
+    
     Response:
     {
         "order": {...},
@@ -172,6 +227,8 @@ def checkout(current_user):
         
         return success_response(data=result, message=result['message'])
         
+    except InsufficientStockError as e:
+        return error_response(str(e), 409, errors=e.shortfalls)
     except Exception as e:
         return error_response(f"Server error: {str(e)}", 500)
 
@@ -180,7 +237,11 @@ def checkout(current_user):
 @jwt_required_custom
 def get_order_history(current_user):
     """
-    Get user's order history (completed baskets)
+    Get user's order history (completed baskets), newest first
+    
+    Query Parameters:
+    - per_page: Orders per page (default: 20, max: 100)
+    - cursor: `next_cursor` from the previous page (omit for the first page)
     
     Response:
     {
@@ -188,22 +249,59 @@ def get_order_history(current_user):
             {
                 "id": 1,
                 "status": "completed",
-                "items": [...],
-                "total_price": 129.97
+                "total_items": 3,
+                "total_quantity": 5,
+                "total_price": 129.97,
+                "created_at": "...",
+                "completed_at": "..."
             }
-        ]
+        ],
+        "has_next": true,
+        "next_cursor": "..."
     }
+    
+    Use GET /basket/orders/<id> for items.
     """
     try:
-        orders, error = BasketService.get_order_history(current_user)
+        result, error = BasketService.get_order_history(
+            current_user,
+            cursor=request.args.get('cursor'),
+            per_page=request.args.get('per_page', 20)
+        )
         
         if error:
             return error_response(error, 400)
         
         return success_response(
-            data={'orders': orders},
+            data=result,
             message="Order history retrieved successfully"
         )
         
     except Exception as e:
-        return error_response(f"Server error: {str(e)}", 500)
\ No newline at end of file
+        return error_response(f"Server error: {str(e)}", 500)
+
+
+@basket_bp.route('/orders/<int:order_id>', methods=['GET'])
+@jwt_required_custom
+def get_order(current_user, order_id):
+    """
+    Get one order with all items
+    
+    Lines are snapshots taken at checkout (product_name, unit_price,
+    quantity, subtotal), so they don't change with the catalog.
+    
+    Example: GET /basket/orders/1
+    """
+    try:
+        order, error = BasketService.get_order(current_user, order_id)
+        
+        if error:
+            return error_response(error, 404)
+        
+        return success_response(
+            data={'order': order},
+            message="Order retrieved successfully"
+        )
+        
+    except Exception as e:
+        return error_response(f"Server error: {str(e)}", 500)
@@ -1,12 +1,15 @@
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from src.services.product_service import ProductService
-from src.utils.responses import success_response, error_response
-from src.middleware.auth_middleware import jwt_required_custom
+from src.services.product_import_service import ProductImportService
+from src.utils.responses import success_response, error_response, ndjson_response
+from src.middleware.auth_middleware import jwt_required_custom, api_key_or_admin_required
+from src.middleware.http_cache import catalog_cached
 
 product_bp = Blueprint('products', __name__, url_prefix='/products')
 
 
 @product_bp.route('', methods=['GET'])
+@catalog_cached
 def get_products():
     """
     Get all products with pagination and filters
@@ -16,14 +19,34 @@ def get_products():
     - per_page: Items per page (default: 10, max: 100)
     - category: Filter by category (optional)
     - search: Search in name/description (optional)
+    - cursor: Switch to cursor pagination (optional). Send it empty for the
+      first page, then pass back `next_cursor` from each response. `page`
+      is ignored in this mode.
+    - with_total: In cursor mode, also return `total` (default: 0)
     
     Example: GET /products?page=1&per_page=10&category=electronics&search=phone
+    Example: GET /products?cursor=&per_page=50
     """
     try:
         page = request.args.get('page', 1)
         per_page = request.args.get('per_page', 10)
         category = request.args.get('category')
         search = request.args.get('search')
+        cursor = request.args.get('cursor')
+        
+        if cursor is not None:
+            result, error = ProductService.get_products_by_cursor(
+                cursor=cursor,
+                per_page=per_page,
+                category=category,
+                search=search,
+                with_total=request.args.get('with_total') in ('1', 'true')
+            )
+            
+            if error:
+                return error_response(error, 400)
+            
+            return success_response(data=result, message="Products retrieved successfully")
         
         result, error = ProductService.get_products(
             page=page,
@@ -42,6 +65,7 @@ def get_products():
 
 
 @product_bp.route('/<int:product_id>', methods=['GET'])
+@catalog_cached
 def get_product(product_id):
     """
     Get a single product by ID
@@ -110,6 +134,98 @@ def create_product(current_user):
         return error_response(f"Server error: {str(e)}", 500)
 
 
+@product_bp.route('/export', methods=['GET'])
+@api_key_or_admin_required
+def export_products(current_user):
+    """
+    Stream the whole catalog as NDJSON (ADMIN or API KEY)
+    
+    Auth: admin Bearer token, or `X-API-Key` header with a key from API_KEYS
+    
+    Query Parameters:
+    - updated_since: Only products updated at/after this ISO 8601 time
+    - gzip: 1 to force gzip (otherwise used when Accept-Encoding allows it)
+    
+    One product per line, same fields as GET /products/<id>. Rows are
+    streamed as they are read, so memory stays flat for any catalog size.
+    
+    Example: GET /products/export?updated_since=2025-01-01T00:00:00Z
+    """
+    try:
+        updated_since, error = ProductService.parse_updated_since(request.args.get('updated_since'))
+        
+        if error:
+            return error_response(error, 400)
+        
+        use_gzip = request.args.get('gzip') in ('1', 'true') or 'gzip' in request.accept_encodings
+        
+        return ndjson_response(
+            ProductService.export_products(updated_since=updated_since),
+            gzip=use_gzip
+        )
+        
+    except Exception as e:
+        return error_response(f"Server error: {str(e)}", 500)
+
+
+@product_bp.route('/import', methods=['POST'])
+@jwt_required_custom
+def import_products(current_user):
+    """
+    Bulk import products from CSV or JSONL (ADMIN ONLY)
+    
+    Send the file as multipart field `file` or as the raw request body.
+    
+    Query Parameters:
+    - format: csv or jsonl (default: from file extension / Content-Type, else csv)
+    - mode: insert (default) or upsert (update existing products with the same name)
+    
+    CSV needs a header row: name,description,price,stock,category,image_url
+    JSONL has one product object per line with the same keys.
+    
+    Response:
+    {
+        "created": 1200,
+        "updated": 0,
+        "failed": 2,
+        "errors": [{"row": 17, "message": "Price must be a valid number"}],
+        "errors_truncated": false
+    }
+    """
+    try:
+        if not current_user.is_admin():
+            return error_response("Only administrators can import products", 403)
+        
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        filename = (upload.filename or '') if upload else ''
+        content_type = (upload.mimetype if upload else request.mimetype) or ''
+        
+        file_format = request.args.get('format')
+        if not file_format:
+            is_jsonl = filename.endswith(('.jsonl', '.ndjson')) or 'ndjson' in content_type or 'jsonl' in content_type
+            file_format = 'jsonl' if is_jsonl else 'csv'
+        
+        report, error = ProductImportService.import_products(
+            user=current_user,
+            stream=stream,
+            file_format=file_format.lower(),
+            upsert=request.args.get('mode') == 'upsert',
+            chunk_size=current_app.config.get('PRODUCT_IMPORT_CHUNK_SIZE', 1000)
+        )
+        
+        if error:
+            return error_response(error, 400)
+        
+        return success_response(
+            data=report,
+            message=f"Imported {report['created'] + report['updated']} products"
+        )
+        
+    except Exception as e:
+        return error_response(f"Server error: {str(e)}", 500)
+
+
 @product_bp.route('/<int:product_id>', methods=['PUT'])
 @jwt_required_custom
 def update_product(current_user, product_id):
@@ -120,7 +236,8 @@ def update_product(current_user, product_id):
     {
         "name": "Updated name",
         "price": 899.99,
-        "stock": 100
+        "stock": 100,
+        "stock_shards": 8       # flash sales: split stock over 8 counters, 0 = off
     }
     """
     try:
@@ -168,14 +285,19 @@ def delete_product(current_user, product_id):
 
 
 @product_bp.route('/categories', methods=['GET'])
+@catalog_cached
 def get_categories():
     """
     Get all product categories
     
-    Example: GET /products/categories
+    Query Parameters:
+    - with_counts: Include product_count and in_stock_count (default: 0)
+    
+    Example: GET /products/categories?with_counts=1
     """
     try:
-        categories, error = ProductService.get_categories()
+        with_counts = request.args.get('with_counts') in ('1', 'true')
+        categories, error = ProductService.get_categories(with_counts=with_counts)
         
         if error:
             return error_response(error, 400)
@@ -1,5 +1,5 @@
-from src.database import bcrypt
 from src.repositories.user_repository import UserRepository
+from src.utils.password_hasher import get_password_hasher
 from src.utils.validators import validate_username, validate_email_format, validate_password
 from flask_jwt_extended import create_access_token, create_refresh_token
 
@@ -8,6 +8,21 @@ class AuthService:
     Authentication Service - Business logic for signup/login
     """
     
+    @staticmethod
+    def issue_tokens(user):
+        """
+        Create access/refresh tokens for a user
+        
+        Identity is the user ID as a STRING (not integer!). Role and username
+        are embedded as claims so the auth middleware can detect stale tokens
+        without loading the User row.
+        """
+        claims = {'role': user.role, 'username': user.username}
+        return (
+            create_access_token(identity=str(user.id), additional_claims=claims),
+            create_refresh_token(identity=str(user.id))
+        )
+    
     @staticmethod
     def signup(username, email, password):
         """Register a new user"""
@@ -34,15 +49,14 @@ class AuthService:
         if UserRepository.user_exists(email=email):
             return None, "Email already exists"
         
-        # Hash password
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        # Hash password (off-thread, may raise PasswordHasherBusy)
+        password_hash = get_password_hasher().hash(password)
         
         # Create user
         user = UserRepository.create_user(username, email, password_hash)
         
-        # Generate JWT tokens with STRING identity (not integer!)
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        # Generate JWT tokens
+        access_token, refresh_token = AuthService.issue_tokens(user)
         
         return {
             'user': user.to_dict(),
@@ -59,13 +73,17 @@ class AuthService:
         if not user:
             return None, "Invalid username or password"
         
-        # Check password
-        if not bcrypt.check_password_hash(user.password_hash, password):
+        # Check password (off-thread, may raise PasswordHasherBusy)
+        hasher = get_password_hasher()
+        if not hasher.verify(user.password_hash, password):
             return None, "Invalid username or password"
         
-        # Generate tokens with STRING identity
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        # Upgrade hashes made with an old cost factor while we have the password
+        if hasher.needs_rehash(user.password_hash):
+            UserRepository.update_password_hash(user, hasher.hash(password))
+        
+        # Generate tokens
+        access_token, refresh_token = AuthService.issue_tokens(user)
         
         return {
             'user': user.to_dict(),
@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta
+from src.database import db
+from src.repositories.basket_repository import BasketRepository
+
+
+class BasketReaperService:
+    """
+    Basket Reaper Service - Retires baskets nobody checked out
+    
+    - Active baskets untouched for `abandon_after` become 'abandoned', so
+      active basket lookups only see live carts
+    - Abandoned baskets older than `purge_after` are deleted with their
+      items (optional, keeps basket tables from growing forever)
+    
+    Works in batches of `batch_size` rows, each committed on its own, so no
+    transaction holds locks for long.
+    """
+    
+    @staticmethod
+    def reap(abandon_after, purge_after=None, batch_size=500, now=None):
+        """
+        Run one reaper pass
+        
+        Args:
+            abandon_after: timedelta of inactivity before a basket is abandoned
+            purge_after: timedelta after abandonment before deletion (None = keep)
+            batch_size: Rows per transaction
+        
+        Returns:
+            Report dict: abandoned, purged_baskets, purged_items, batches
+        """
+        now = now or datetime.utcnow()
+        report = {'abandoned': 0, 'purged_baskets': 0, 'purged_items': 0, 'batches': 0}
+        
+        while True:
+            count = BasketRepository.abandon_stale(now - abandon_after, limit=batch_size)
+            db.session.commit()
+            report['abandoned'] += count
+            report['batches'] += 1
+            if count < batch_size:
+                break
+        
+        if purge_after is not None:
+            while True:
+                baskets, items = BasketRepository.purge_abandoned(now - purge_after, limit=batch_size)
+                db.session.commit()
+                report['purged_baskets'] += baskets
+                report['purged_items'] += items
+                report['batches'] += 1
+                if baskets < batch_size:
+                    break
+        
+        return report
+    
+    @staticmethod
+    def reap_from_config(app):
+        """Run one pass with the app's BASKET_* settings (call inside app context)"""
+        purge_days = app.config.get('BASKET_PURGE_AFTER_DAYS', 0)
+        return BasketReaperService.reap(
+            abandon_after=timedelta(days=app.config.get('BASKET_ABANDON_AFTER_DAYS', 14)),
+            purge_after=timedelta(days=purge_days) if purge_days else None,
+            batch_size=app.config.get('BASKET_REAPER_BATCH_SIZE', 500)
+        )
+
+
+def start_basket_reaper(app):
+    """
+    Run the reaper every BASKET_REAPER_INTERVAL seconds in a daemon thread
+    
+    Off by default (interval 0). Meant for single-process deployments; with
+    pre-forked workers, schedule `python reap_baskets.py` from cron instead.
+    
+    Returns:
+        threading.Event that stops the loop when set, or None if disabled
+    """
+    interval = app.config.get('BASKET_REAPER_INTERVAL', 0)
+    if not interval:
+        return None
+    
+    stop = threading.Event()
+    
+    def loop():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    report = BasketReaperService.reap_from_config(app)
+                    if report['abandoned'] or report['purged_baskets']:
+                        app.logger.info(f"Basket reaper: {report}")
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Basket reaper pass failed")
+                finally:
+                    db.session.remove()
+    
+    threading.Thread(target=loop, name='basket-reaper', daemon=True).start()
+    return stop
@@ -1,10 +1,23 @@
 from src.repositories.basket_repository import BasketRepository
 from src.repositories.product_repository import ProductRepository
+from src.repositories.order_repository import OrderRepository
 from src.database import db  # ← ADD THIS LINE
+from src.utils.pagination import encode_cursor, decode_cursor
+
+class InsufficientStockError(Exception):
+    """Raised by checkout when some lines can't be fulfilled"""
+    
+    def __init__(self, shortfalls):
+        super().__init__("Some products do not have enough stock")
+        self.shortfalls = shortfalls
+
 
 class BasketService:
     """
     Basket Service - Business logic for shopping cart
+    
+    Mutations change the loaded basket in place and return it serialized
+    from the identity map; the unit of work commits after the route.
     """
     
     @staticmethod
@@ -16,7 +29,7 @@ class BasketService:
             (basket_data, error) tuple
         """
         try:
-            basket = BasketRepository.get_or_create_basket(user.id)
+            basket = BasketRepository.get_or_create_basket(user.id, with_items=True)
             return basket.to_dict(), None
         except Exception as e:
             return None, f"Error fetching basket: {str(e)}"
@@ -43,7 +56,15 @@ class BasketService:
         except (TypeError, ValueError):
             return None, "Invalid quantity"
         
-        # Check if product exists
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            return None, "Invalid product ID"
+        
+        # Get or create basket (items and their products in one query)
+        basket = BasketRepository.get_or_create_basket(user.id, with_items=True)
+        
+        # Check if product exists (identity map hit if it's already in the basket)
         product = ProductRepository.get_product_by_id(product_id)
         if not product:
             return None, "Product not found"
@@ -52,15 +73,8 @@ class BasketService:
         if product.stock < quantity:
             return None, f"Not enough stock. Available: {product.stock}"
         
-        # Get or create basket
-        basket = BasketRepository.get_or_create_basket(user.id)
-        
         # Calculate total quantity if item already in basket
-        existing_item = None
-        for item in basket.items:
-            if item.product_id == product_id:
-                existing_item = item
-                break
+        existing_item = BasketRepository.find_item(basket, product_id)
         
         total_quantity = quantity
         if existing_item:
@@ -70,11 +84,9 @@ class BasketService:
         if total_quantity > product.stock:
             return None, f"Cannot add {quantity}. Maximum available: {product.stock - (existing_item.quantity if existing_item else 0)}"
         
-        # Add item to basket
-        item, created = BasketRepository.add_item(basket.id, product_id, quantity)
-        
-        # Refresh basket to get updated data
-        basket = BasketRepository.get_basket_by_id(basket.id)
+        # Add item to basket (basket.items is updated in place)
+        item, created = BasketRepository.add_item(basket, product_id, quantity, existing_item=existing_item)
+        item.product = product
         
         action = "added to" if created else "updated in"
         return {
@@ -104,8 +116,13 @@ class BasketService:
         except (TypeError, ValueError):
             return None, "Invalid quantity"
         
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            return None, "Invalid product ID"
+        
         # Get basket
-        basket = BasketRepository.get_active_basket(user.id)
+        basket = BasketRepository.get_active_basket(user.id, with_items=True)
         if not basket:
             return None, "Basket not found"
         
@@ -119,13 +136,10 @@ class BasketService:
                 return None, f"Not enough stock. Available: {product.stock}"
         
         # Update item
-        item = BasketRepository.update_item_quantity(basket.id, product_id, quantity)
+        item = BasketRepository.update_item_quantity(basket, product_id, quantity)
         if not item and quantity > 0:
             return None, "Item not found in basket"
         
-        # Refresh basket
-        basket = BasketRepository.get_basket_by_id(basket.id)
-        
         message = "Item removed from basket" if quantity == 0 else "Item quantity updated"
         return {
             'basket': basket.to_dict(),
@@ -146,18 +160,15 @@ class BasketService:
         """
         
         # Get basket
-        basket = BasketRepository.get_active_basket(user.id)
+        basket = BasketRepository.get_active_basket(user.id, with_items=True)
         if not basket:
             return None, "Basket not found"
         
         # Remove item
-        success = BasketRepository.remove_item(basket.id, product_id)
+        success = BasketRepository.remove_item(basket, product_id)
         if not success:
             return None, "Item not found in basket"
         
-        # Refresh basket
-        basket = BasketRepository.get_basket_by_id(basket.id)
-        
         return {
             'basket': basket.to_dict(),
             'message': "Item removed from basket"
@@ -173,32 +184,140 @@ class BasketService:
         """
         
         # Get basket
-        basket = BasketRepository.get_active_basket(user.id)
+        basket = BasketRepository.get_active_basket(user.id, with_items=True)
         if not basket:
             return None, "Basket not found"
         
         # Clear basket
-        BasketRepository.clear_basket(basket.id)
-        
-        # Refresh basket
-        basket = BasketRepository.get_basket_by_id(basket.id)
+        BasketRepository.clear_basket(basket)
         
         return {
             'basket': basket.to_dict(),
             'message': "Basket cleared"
         }, None
     
+    @staticmethod
+    def apply_batch(user, operations):
+        """
+        Apply several basket operations at once
+        
+        Each operation is {"product_id", "quantity", "op"} where op is:
+        - 'add': add quantity to the line (default)
+        - 'set': set the line quantity (0 removes it)
+        - 'remove': remove the line (quantity ignored)
+        
+        All products are loaded with one IN query and stock is checked
+        against the basket's running quantities. Valid lines are applied
+        in the request's transaction; invalid lines are skipped and
+        reported with their index.
+        
+        Returns:
+            (result, error) tuple
+            - result: {'basket', 'applied', 'errors'}
+        """
+        
+        parsed = []
+        errors = []
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                errors.append({'index': index, 'message': "Operation must be an object"})
+                continue
+            
+            op = operation.get('op', 'add')
+            if op not in ('add', 'set', 'remove'):
+                errors.append({'index': index, 'message': f"Unknown op '{op}'"})
+                continue
+            
+            try:
+                product_id = int(operation.get('product_id'))
+            except (TypeError, ValueError):
+                errors.append({'index': index, 'message': "Invalid product ID"})
+                continue
+            
+            quantity = 0
+            if op != 'remove':
+                try:
+                    quantity = int(operation.get('quantity', 1 if op == 'add' else None))
+                except (TypeError, ValueError):
+                    errors.append({'index': index, 'product_id': product_id, 'message': "Invalid quantity"})
+                    continue
+                
+                if (op == 'add' and quantity <= 0) or quantity < 0:
+                    errors.append({'index': index, 'product_id': product_id, 'message': "Quantity must be positive"})
+                    continue
+            
+            parsed.append((index, op, product_id, quantity))
+        
+        # Basket with items, then every product in one IN query
+        basket = BasketRepository.get_or_create_basket(user.id, with_items=True)
+        products = ProductRepository.get_products_by_ids([p[2] for p in parsed])
+        
+        # Lines not in the basket yet are collected and written with one upsert
+        new_lines = {}
+        applied = 0
+        for index, op, product_id, quantity in parsed:
+            item = BasketRepository.find_item(basket, product_id)
+            
+            if op == 'remove' or (op == 'set' and quantity == 0):
+                if item:
+                    BasketRepository.remove_item(basket, product_id)
+                elif new_lines.pop(product_id, None) is None:
+                    errors.append({'index': index, 'product_id': product_id, 'message': "Item not found in basket"})
+                    continue
+                applied += 1
+                continue
+            
+            product = products.get(product_id)
+            if not product:
+                errors.append({'index': index, 'product_id': product_id, 'message': "Product not found"})
+                continue
+            
+            current = item.quantity if item else new_lines.get(product_id, 0)
+            target = current + quantity if op == 'add' else quantity
+            if target > product.stock:
+                errors.append({
+                    'index': index,
+                    'product_id': product_id,
+                    'message': f"Not enough stock. Available: {product.stock}"
+                })
+                continue
+            
+            if item:
+                item.quantity = target
+            else:
+                new_lines[product_id] = target
+            applied += 1
+        
+        for product_id, item in BasketRepository.add_items(basket, new_lines).items():
+            item.product = products[product_id]
+        
+        # One flush for the remaining line changes
+        db.session.flush()
+        
+        return {
+            'basket': basket.to_dict(),
+            'applied': applied,
+            'errors': sorted(errors, key=lambda e: e['index'])
+        }, None
+    
     @staticmethod
     def checkout(user):
         """
         Checkout basket (mark as completed and create new active basket)
         
+        Stock decrements, the order snapshot, basket completion and the new
+        basket are written in one transaction (committed by the unit of
+        work). If any product is short, nothing is written.
+        
         Returns:
             (order_data, error) tuple
+        
+        Raises:
+            InsufficientStockError: with a per-line report of shortfalls
         """
         
         # Get basket
-        basket = BasketRepository.get_active_basket(user.id)
+        basket = BasketRepository.get_active_basket(user.id, with_items=True)
         if not basket:
             return None, "Basket not found"
         
@@ -206,40 +325,95 @@ class BasketService:
         if not basket.items:
             return None, "Cannot checkout empty basket"
         
-        # Check stock availability for all items
-        for item in basket.items:
-            if item.product.stock < item.quantity:
-                return None, f"Product '{item.product.name}' is out of stock. Available: {item.product.stock}"
-        
-        # Reduce stock for each product
+        # One line per product (quantities of duplicate lines add up)
+        quantities = {}
         for item in basket.items:
-            product = item.product
-            product.stock -= item.quantity
-        
-        # Mark basket as completed
-        BasketRepository.complete_basket(basket.id)
-        
-        # Create new active basket for user
-        new_basket = BasketRepository.create_basket(user.id)
-        
-        db.session.commit()
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        
+        # Check and decrement stock for all lines in one guarded UPDATE
+        products = {item.product_id: item.product for item in basket.items}
+        ok, stock = ProductRepository.reserve_stock(quantities, loaded_products=products.values())
+        
+        if not ok:
+            # Report before rolling back: rollback expires the loaded products
+            shortfalls = [
+                {
+                    'product_id': product_id,
+                    'name': products[product_id].name if products[product_id] else None,
+                    'requested': quantity,
+                    'available': stock.get(product_id, 0)
+                }
+                for product_id, quantity in quantities.items()
+                if stock.get(product_id, 0) < quantity
+            ]
+            db.session.rollback()
+            raise InsufficientStockError(shortfalls)
+        
+        # Snapshot lines (name, price) so the order never changes later
+        order = OrderRepository.create_from_basket(basket)
+        
+        # Mark basket as completed and create new active basket for user
+        new_basket = BasketRepository.complete_and_renew(basket)
         
         return {
-            'order': basket.to_dict(),
+            'order': order.to_dict(),
             'message': 'Checkout successful',
             'new_basket': new_basket.to_dict()
         }, None
     
     @staticmethod
-    def get_order_history(user):
+    def get_order_history(user, cursor=None, per_page=20):
         """
-        Get user's completed orders
+        Get user's completed orders as summaries (cursor paginated)
+        
+        Args:
+            user: Current user
+            cursor: Opaque token from a previous response's next_cursor
+            per_page: Orders per page (max 100)
         
         Returns:
-            (orders, error) tuple
+            (result, error) tuple
         """
         try:
-            orders = BasketRepository.get_user_baskets(user.id, status='completed')
-            return [order.to_dict() for order in orders], None
+            per_page = int(per_page) if per_page else 20
+        except (TypeError, ValueError):
+            return None, "Invalid per_page"
+        
+        per_page = max(1, min(per_page, 100))
+        
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                return None, str(e)
+        
+        try:
+            orders, has_next = OrderRepository.get_order_summaries(user.id, after=after, limit=per_page)
+            
+            next_cursor = None
+            if has_next:
+                next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+            
+            return {
+                'orders': [order.to_summary_dict() for order in orders],
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': next_cursor
+            }, None
         except Exception as e:
-            return None, f"Error fetching orders: {str(e)}"
\ No newline at end of file
+            return None, f"Error fetching orders: {str(e)}"
+    
+    @staticmethod
+    def get_order(user, order_id):
+        """
+        Get full detail of one completed order
+        
+        Returns:
+            (order_data, error) tuple
+        """
+        order = OrderRepository.get_order(user.id, order_id)
+        if not order:
+            return None, "Order not found"
+        
+        return order.to_dict(), None
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from src.database import db
+from src.repositories.product_repository import ProductRepository
+from src.services.product_service import ProductService
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+PRODUCT_FIELDS = ('name', 'description', 'price', 'stock', 'category', 'image_url')
+
+
+class ProductImportService:
+    """
+    Product Import Service - Bulk catalog loading from CSV or JSONL
+    
+    Rows are parsed one at a time from the stream, validated with the same
+    rules as POST /products and written in chunks (one executemany and one
+    commit per chunk), so memory stays flat for any file size.
+    """
+    
+    @staticmethod
+    def text_stream(stream):
+        """Wrap a binary stream (request body, uploaded file) for text parsing"""
+        if isinstance(stream, io.TextIOBase):
+            return stream
+        if isinstance(stream, io.RawIOBase):
+            stream = io.BufferedReader(stream)
+        return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    @staticmethod
+    def iter_records(text, file_format):
+        """
+        Yield (row_number, record, error) for each input record
+        
+        row_number is the 1-based data row (CSV) or line number (JSONL).
+        """
+        if file_format == 'csv':
+            reader = csv.DictReader(text)
+            for row_number, record in enumerate(reader, start=1):
+                yield row_number, record, None
+            return
+        
+        for row_number, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {str(e)}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, record, None
+    
+    @staticmethod
+    def import_products(user, stream, file_format='csv', upsert=False, chunk_size=1000, max_errors=100):
+        """
+        Import products from a CSV/JSONL stream (admin only)
+        
+        Args:
+            user: Importing user (must be admin, becomes created_by)
+            stream: Binary or text stream
+            file_format: 'csv' (header row with product fields) or 'jsonl'
+            upsert: Update existing products matched by name
+            chunk_size: Rows per executemany/commit
+            max_errors: Row errors to include in the report (all are counted)
+        
+        Returns:
+            (report, error) tuple
+        """
+        if not user.is_admin():
+            return None, "Only administrators can import products"
+        
+        if file_format not in IMPORT_FORMATS:
+            return None, f"Unsupported format '{file_format}' (use csv or jsonl)"
+        
+        report = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+        
+        def fail(row_number, message):
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'row': row_number, 'message': message})
+        
+        def flush_chunk(chunk):
+            try:
+                created, updated = ProductRepository.bulk_save(
+                    [fields for _, fields in chunk], user.id, upsert=upsert
+                )
+                db.session.commit()
+                report['created'] += created
+                report['updated'] += updated
+            except Exception as e:
+                db.session.rollback()
+                for row_number, _ in chunk:
+                    fail(row_number, f"Database error: {str(e)}")
+        
+        chunk = []
+        records = ProductImportService.iter_records(
+            ProductImportService.text_stream(stream), file_format
+        )
+        
+        try:
+            for row_number, record, error in records:
+                if error:
+                    fail(row_number, error)
+                    continue
+                
+                fields, error = ProductService.validate_product(
+                    **{field: record.get(field) for field in PRODUCT_FIELDS}
+                )
+                if error:
+                    fail(row_number, error)
+                    continue
+                
+                chunk.append((row_number, fields))
+                if len(chunk) >= chunk_size:
+                    flush_chunk(chunk)
+                    chunk = []
+        except (csv.Error, UnicodeDecodeError) as e:
+            fail(None, f"Could not parse input: {str(e)}")
+        
+        if chunk:
+            flush_chunk(chunk)
+        
+        report['errors_truncated'] = report['failed'] > len(report['errors'])
+        return report, None
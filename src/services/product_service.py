@@ -1,4 +1,9 @@
+import json
+from datetime import datetime, timezone
+from src.models.product import Product
 from src.repositories.product_repository import ProductRepository
+from src.repositories.stock_shard_repository import MAX_STOCK_SHARDS
+from src.utils.pagination import encode_cursor, decode_cursor
 
 class ProductService:
     """
@@ -6,16 +11,15 @@ class ProductService:
     """
     
     @staticmethod
-    def create_product(user, name, description, price, stock, category=None, image_url=None):
-        """
-        Create a new product (admin only)
+    def validate_product(name, description, price, stock, category=None, image_url=None):
         """
+        Validate and normalize product fields
         
-        # Authorization: Only admins can create products
-        if not user.is_admin():
-            return None, "Only administrators can create products"
+        Shared by single create and bulk import so both apply the same rules.
         
-        # Validation
+        Returns:
+            (fields, error) tuple - fields is a dict ready for the repository
+        """
         if not name or len(str(name).strip()) < 3:
             return None, "Product name must be at least 3 characters"
         
@@ -38,16 +42,34 @@ class ProductService:
         except (TypeError, ValueError):
             return None, "Stock must be a valid number"
         
-        # Create product
-        product = ProductRepository.create_product(
-            name=str(name).strip(),
-            description=str(description).strip(),
-            price=price,
-            stock=stock,
-            category=str(category).strip() if category else None,
-            image_url=str(image_url).strip() if image_url else None,
-            created_by=user.id
+        return {
+            'name': str(name).strip(),
+            'description': str(description).strip(),
+            'price': price,
+            'stock': stock,
+            'category': str(category).strip() if category else None,
+            'image_url': str(image_url).strip() if image_url else None
+        }, None
+    
+    @staticmethod
+    def create_product(user, name, description, price, stock, category=None, image_url=None):
+        """
+        Create a new product (admin only)
+        """
+        
+        # Authorization: Only admins can create products
+        if not user.is_admin():
+            return None, "Only administrators can create products"
+        
+        # Validation
+        fields, error = ProductService.validate_product(
+            name, description, price, stock, category, image_url
         )
+        if error:
+            return None, error
+        
+        # Create product
+        product = ProductRepository.create_product(created_by=user.id, **fields)
         
         return product, None
     
@@ -71,26 +93,124 @@ class ProductService:
             if per_page > 100:
                 per_page = 100
             
-            pagination = ProductRepository.get_all_products(
+            if page < 1:
+                page = 1
+            if per_page < 1:
+                per_page = 10
+            
+            # Column tuples serialized directly (no ORM hydration)
+            rows, total = ProductRepository.get_product_rows(
                 page=page,
                 per_page=per_page,
                 category=category,
                 search=search
             )
             
+            pages = -(-total // per_page)  # ceil
+            
             return {
-                'products': [p.to_dict() for p in pagination.items],
-                'total': pagination.total,
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'products': [Product.row_to_dict(row) for row in rows],
+                'total': total,
+                'page': page,
+                'per_page': per_page,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             }, None
             
         except Exception as e:
             return None, f"Error fetching products: {str(e)}"
     
+    @staticmethod
+    def get_products_by_cursor(cursor=None, per_page=10, category=None, search=None, with_total=False):
+        """
+        Get products with keyset (cursor) pagination
+        
+        Args:
+            cursor: Opaque token from a previous response's next_cursor
+                    (empty/None for the first page)
+            with_total: Include the total count (costs an extra COUNT query)
+        
+        Returns:
+            (result, error) tuple
+        """
+        try:
+            per_page = int(per_page) if per_page else 10
+        except (TypeError, ValueError):
+            return None, "Invalid per_page"
+        
+        per_page = max(1, min(per_page, 100))
+        
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                return None, str(e)
+        
+        try:
+            products, has_next, total = ProductRepository.get_products_page(
+                after=after,
+                limit=per_page,
+                category=category,
+                search=search,
+                with_total=with_total
+            )
+            
+            next_cursor = None
+            if has_next:
+                last = products[-1]
+                next_cursor = encode_cursor(last.created_at, last.id)
+            
+            result = {
+                'products': [Product.row_to_dict(row) for row in products],
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': next_cursor
+            }
+            if total is not None:
+                result['total'] = total
+            
+            return result, None
+            
+        except Exception as e:
+            return None, f"Error fetching products: {str(e)}"
+    
+    @staticmethod
+    def parse_updated_since(value):
+        """
+        Parse the export's updated_since filter (ISO 8601)
+        
+        Returns:
+            (datetime or None, error) tuple
+        """
+        if not value:
+            return None, None
+        try:
+            since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None, "updated_since must be an ISO 8601 date/time"
+        
+        # Timestamps are stored as naive UTC
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return since, None
+    
+    @staticmethod
+    def export_products(updated_since=None, chunk_size=1000):
+        """
+        Generate the catalog as NDJSON (one product object per line)
+        
+        Yields one bytes chunk per fetched batch of rows.
+        """
+        rows = ProductRepository.iter_product_rows(updated_since, chunk_size)
+        
+        for partition in rows.partitions():
+            yield ''.join(
+                json.dumps(Product.row_to_dict(row), separators=(',', ':')) + '\n'
+                for row in partition
+            ).encode('utf-8')
+    
     @staticmethod
     def update_product(user, product_id, **kwargs):
         """
@@ -121,6 +241,16 @@ class ProductService:
             except (TypeError, ValueError):
                 return None, "Stock must be a valid number"
         
+        # Validate stock shards if provided (0 = not sharded)
+        if 'stock_shards' in kwargs:
+            try:
+                stock_shards = int(kwargs['stock_shards'])
+                if not 0 <= stock_shards <= MAX_STOCK_SHARDS:
+                    return None, f"Stock shards must be between 0 and {MAX_STOCK_SHARDS}"
+                kwargs['stock_shards'] = stock_shards
+            except (TypeError, ValueError):
+                return None, "Stock shards must be a valid number"
+        
         # Update product
         product = ProductRepository.update_product(product_id, **kwargs)
         if not product:
@@ -145,7 +275,14 @@ class ProductService:
         return True, None
     
     @staticmethod
-    def get_categories():
-        """Get all product categories"""
+    def get_categories(with_counts=False):
+        """
+        Get all product categories
+        
+        Args:
+            with_counts: Return dicts with product/in-stock counts instead of names
+        """
         categories = ProductRepository.get_categories()
-        return categories, None
\ No newline at end of file
+        if with_counts:
+            return [c.to_dict() for c in categories], None
+        return [c.name for c in categories], None
\ No newline at end of file
@@ -1,10 +1,11 @@
 from src.utils.validators import validate_username, validate_email_format, validate_password
-from src.utils.responses import success_response, error_response
+from src.utils.responses import success_response, error_response, ndjson_response
 
 __all__ = [
     'validate_username',
     'validate_email_format', 
     'validate_password',
     'success_response',
-    'error_response'
+    'error_response',
+    'ndjson_response'
 ]
\ No newline at end of file
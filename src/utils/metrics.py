@@ -0,0 +1,120 @@
+import os
+import threading
+from bisect import bisect_left
+
+# Request latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+    
+    type = 'counter'
+    
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def collect(self, const_labels=()):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield f'{self.name}{_format_labels(self.labels, label_values, const_labels)} {_format_value(value)}'
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels
+    
+    Stores one count per bucket plus sum/count per label set, so observe()
+    is a bisect and a few additions.
+    """
+    
+    type = 'histogram'
+    
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+    
+    def collect(self, const_labels=()):
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+        
+        for label_values, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, const_labels + (('le', bound),))
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labels, label_values, const_labels)
+            yield f'{self.name}_sum{labels} {_format_value(series[-1])}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class MetricsRegistry:
+    """
+    Holds metrics and renders them in the Prometheus text format
+    
+    Values live in this process only. Under pre-forked workers every
+    worker has its own registry and a scrape of /metrics reaches one of
+    them, so each series carries a `pid` label; sum over pid in queries.
+    """
+    
+    def __init__(self):
+        self._metrics = []
+    
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+    
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+    
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self):
+        """Exposition text (version 0.0.4)"""
+        # Read at render time: the registry is created before gunicorn forks
+        const_labels = (('pid', os.getpid()),)
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.collect(const_labels))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,28 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at, item_id):
+    """
+    Encode a keyset position as an opaque, URL-safe token
+
+    Clients should treat the token as a black box and just send it back.
+    """
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token from encode_cursor back into (created_at, id)
+
+    Raises:
+        ValueError: if the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
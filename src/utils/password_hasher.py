@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from src.database import bcrypt
+
+PASSWORD_HASHER_KEY = 'password_hasher'
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already queued, or one timed out"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool
+    
+    Why?
+    - bcrypt is deliberately slow (~250 ms at cost 12); a login spike would
+      otherwise tie up every request worker
+    - At most `workers` hashes run at once and at most `queue_size` more may
+      wait; beyond that callers get PasswordHasherBusy immediately so the
+      route can answer 503 instead of piling up
+    - A caller that waited `timeout` seconds gets PasswordHasherBusy too
+    """
+    
+    def __init__(self, rounds=12, workers=None, queue_size=None, timeout=30):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 4 if queue_size is None else queue_size
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self.observer = None  # callable(operation, seconds), see src/middleware/metrics.py
+    
+    def _get_executor(self):
+        # Threads don't survive fork: a pre-forked worker starts its own pool
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+                    self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+                    self._pid = os.getpid()
+        return self._executor
+    
+    def _run(self, operation, fn, *args):
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        
+        try:
+            future = executor.submit(self._timed, fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            result, elapsed = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it. Already running: it finishes unobserved.
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing timed out")
+        if self.observer:
+            self.observer(operation, elapsed)
+        return result
+    
+    @staticmethod
+    def _timed(fn, *args):
+        # Measured on the worker, so time spent queued is not counted
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - started
+    
+    def hash(self, password):
+        """Hash a password with the configured cost"""
+        return self._run('hash', self._hash, password)
+    
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run('verify', bcrypt.check_password_hash, password_hash, password)
+    
+    def needs_rehash(self, password_hash):
+        """Check if a stored hash was made with a different cost factor"""
+        try:
+            # Format: $2b$<cost>$<salt+hash>
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+    
+    def _hash(self, password):
+        return bcrypt.generate_password_hash(password, self.rounds).decode('utf-8')
+    
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+
+def init_password_hasher(app):
+    """Attach a password hasher configured from app config"""
+    app.extensions[PASSWORD_HASHER_KEY] = PasswordHasher(
+        rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        workers=app.config.get('PASSWORD_HASH_WORKERS'),
+        queue_size=app.config.get('PASSWORD_HASH_QUEUE_SIZE'),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 30)
+    )
+
+
+def get_password_hasher():
+    """Password hasher of the current app"""
+    return current_app.extensions[PASSWORD_HASHER_KEY]
@@ -0,0 +1,164 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_RATE_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$')
+
+
+def parse_rate(rate):
+    """
+    Parse "10/minute" or "100/5minutes" into (capacity, period_seconds)
+    
+    Capacity is also the burst size: a full bucket allows `capacity`
+    requests at once, then refills at capacity/period per second.
+    """
+    match = _RATE_RE.match(rate or '')
+    if not match:
+        raise ValueError(f"Invalid rate '{rate}', expected e.g. '10/minute'")
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[period]
+
+
+def _take(tokens, updated_at, now, capacity, refill_rate):
+    """
+    Token bucket step
+    
+    Returns:
+        (allowed, tokens_left, retry_after_seconds)
+    """
+    if tokens is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+    
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, math.ceil((1 - tokens) / refill_rate)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a dict (single process: dev server, tests)
+    
+    Keys are kept in last-update order, so buckets that have refilled
+    completely (same as never used) are dropped from the front in O(1).
+    """
+    
+    def __init__(self):
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, expires_at)
+        self._lock = threading.Lock()
+    
+    def peek(self, key, capacity, period):
+        """Would take() allow this request? Consumes nothing"""
+        refill_rate = capacity / period
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (None, None, None))
+        allowed, _, retry_after = _take(tokens, updated_at, time.time(), capacity, refill_rate)
+        return allowed, retry_after
+    
+    def take(self, key, capacity, period):
+        refill_rate = capacity / period
+        now = time.time()
+        
+        with self._lock:
+            while self._buckets:
+                oldest = next(iter(self._buckets.values()))
+                if oldest[2] > now:
+                    break
+                self._buckets.popitem(last=False)
+            
+            tokens, updated_at, _ = self._buckets.pop(key, (None, None, None))
+            allowed, tokens, retry_after = _take(tokens, updated_at, now, capacity, refill_rate)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+        
+        return allowed, retry_after
+    
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a local SQLite file, shared by every worker process
+    
+    One row per active key. Each check is a short IMMEDIATE transaction,
+    so concurrent workers see each other's updates. Rows whose bucket has
+    refilled completely are purged every `purge_interval` checks.
+    Durability is not needed, so the file runs with synchronous=OFF.
+    """
+    
+    def __init__(self, path, purge_interval=1000):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._calls = 0
+    
+    def _connection(self):
+        # One connection per thread, reopened after fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                ' key TEXT PRIMARY KEY, tokens REAL NOT NULL,'
+                ' updated_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_rate_limit_expires ON rate_limit_buckets (expires_at)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def peek(self, key, capacity, period):
+        """Would take() allow this request? Consumes nothing"""
+        row = self._connection().execute(
+            'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+        ).fetchone()
+        allowed, _, retry_after = _take(
+            row[0] if row else None, row[1] if row else None, time.time(), capacity, capacity / period
+        )
+        return allowed, retry_after
+    
+    def take(self, key, capacity, period):
+        refill_rate = capacity / period
+        now = time.time()
+        conn = self._connection()
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            allowed, tokens, retry_after = _take(
+                row[0] if row else None, row[1] if row else None, now, capacity, refill_rate
+            )
+            conn.execute(
+                'INSERT INTO rate_limit_buckets (key, tokens, updated_at, expires_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, '
+                'updated_at = excluded.updated_at, expires_at = excluded.expires_at',
+                (key, tokens, now, now + (capacity - tokens) / refill_rate)
+            )
+            
+            self._calls += 1
+            if self._calls % self.purge_interval == 0:
+                conn.execute('DELETE FROM rate_limit_buckets WHERE expires_at <= ?', (now,))
+            
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        return allowed, retry_after
+
+
+def create_bucket_store(storage):
+    """'memory' or a SQLite file path"""
+    if storage == 'memory':
+        return MemoryBucketStore()
+    return SQLiteBucketStore(storage)
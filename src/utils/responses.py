@@ -1,4 +1,5 @@
-from flask import jsonify
+import zlib
+from flask import Response, jsonify, stream_with_context
 
 def success_response(data=None, message="Success", status_code=200):
     """
@@ -35,4 +36,27 @@ def error_response(message="An error occurred", status_code=400, errors=None):
     if errors:
         response['errors'] = errors
     
-    return jsonify(response), status_code
\ No newline at end of file
+    return jsonify(response), status_code
+
+def _gzip_chunks(chunks):
+    """Compress a stream of byte chunks into a single gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def ndjson_response(chunks, gzip=False):
+    """
+    Streaming NDJSON response
+    
+    chunks is a generator of bytes; it runs while the response is sent,
+    inside the request context, so nothing is buffered server-side.
+    """
+    body = _gzip_chunks(chunks) if gzip else chunks
+    response = Response(stream_with_context(body), mimetype='application/x-ndjson')
+    if gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,86 @@
+"""
+SQL query-count budgets for tests
+
+    with QueryCounter(db.engine) as queries:
+        client.get('/basket', headers=headers)
+    self.assertQueryBudget(queries, 3, 'GET /basket')
+
+A failing budget lists every statement that ran, so an N+1 shows up as
+the same SELECT repeated with different parameters.
+"""
+import unittest
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Record SQL statements executed on an engine while the block runs"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def report(self):
+        """Numbered statements with their parameters"""
+        lines = []
+        for number, (statement, parameters) in enumerate(self.statements, start=1):
+            sql = ' '.join(statement.split())
+            lines.append(f'{number:>3}. {sql}')
+            if parameters:
+                lines.append(f'     params: {parameters!r}'[:300])
+        return '\n'.join(lines)
+
+
+class QueryBudget:
+    """
+    Max statements one request may run
+
+    Args:
+        method, path: Request (path may use {product_id} / {order_id})
+        max_queries: Budget for the request
+        auth: 'user', 'admin' or None
+        json: Request body, or fn(case) returning it
+        status: Expected response status
+        setup: Optional fn(case) run before counting (not counted)
+        name: Tells apart budgets for the same method and path
+    """
+
+    def __init__(self, method, path, max_queries, auth=None, json=None, status=200, setup=None, name=None):
+        self.method = method
+        self.path = path
+        self.max_queries = max_queries
+        self.auth = auth
+        self.json = json
+        self.status = status
+        self.setup = setup
+        self.name = name
+
+    @property
+    def label(self):
+        label = f'{self.method} {self.path}'
+        return f'{label} ({self.name})' if self.name else label
+
+
+class QueryBudgetTestCase(unittest.TestCase):
+    """TestCase with assertQueryBudget"""
+
+    def assertQueryBudget(self, counter, max_queries, label):
+        if counter.count > max_queries:
+            self.fail(
+                f'{label} ran {counter.count} queries, budget is {max_queries}:\n{counter.report()}'
+            )
@@ -0,0 +1,125 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from src.repositories.basket_repository import BasketRepository
+from src.repositories.product_repository import ProductRepository
+
+
+class BasketBatchTest(unittest.TestCase):
+    """POST /basket/items:batch applies valid lines and reports the rest by index"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.user = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=str(self.user_id))}'}
+
+        self.lamp = self.create_product('Lamp', 5)
+        self.kettle = self.create_product('Kettle', 10)
+        self.mug = self.create_product('Mug', 3)
+        self.plate = self.create_product('Plate', 2)
+
+        basket = BasketRepository.get_or_create_basket(self.user_id, with_items=True)
+        BasketRepository.add_item(basket, self.kettle, 2)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def create_product(self, name, stock):
+        product = ProductRepository.create_product(
+            name=name,
+            description='Test product description',
+            price=10.0,
+            stock=stock,
+            category='test',
+            image_url=None,
+            created_by=self.user_id
+        )
+        db.session.commit()
+        return product.id
+
+    def batch(self, operations):
+        return self.client.post('/basket/items:batch', json={'operations': operations}, headers=self.headers)
+
+    def basket_lines(self):
+        response = self.client.get('/basket', headers=self.headers)
+        return {item['product']['id']: item['quantity'] for item in response.get_json()['data']['items']}
+
+    def test_mixed_operations(self):
+        response = self.batch([
+            {'product_id': self.lamp, 'quantity': 2},                   # 0 new line
+            {'product_id': self.lamp, 'quantity': 2, 'op': 'add'},      # 1 running total 4
+            {'product_id': self.lamp, 'quantity': 2, 'op': 'add'},      # 2 6 > 5 in stock
+            {'product_id': self.kettle, 'quantity': 7, 'op': 'set'},    # 3 existing line
+            {'product_id': self.mug, 'op': 'remove'},                   # 4 not in basket
+            {'product_id': self.mug, 'quantity': 3},                    # 5 new line...
+            {'product_id': self.mug, 'quantity': 0, 'op': 'set'},       # 6 ...dropped again
+            {'product_id': 'x'},                                        # 7
+            {'product_id': self.lamp, 'op': 'bogus'},                   # 8
+            {'product_id': 999, 'quantity': 1},                         # 9
+            'not an object',                                            # 10
+            {'product_id': self.plate, 'quantity': 0},                  # 11
+            {'product_id': self.plate, 'quantity': 2},                  # 12
+        ])
+
+        self.assertEqual(response.status_code, 200, response.get_json())
+        data = response.get_json()['data']
+        self.assertEqual(data['applied'], 6)
+        self.assertEqual(data['errors'], [
+            {'index': 2, 'product_id': self.lamp, 'message': 'Not enough stock. Available: 5'},
+            {'index': 4, 'product_id': self.mug, 'message': 'Item not found in basket'},
+            {'index': 7, 'message': 'Invalid product ID'},
+            {'index': 8, 'message': "Unknown op 'bogus'"},
+            {'index': 9, 'product_id': 999, 'message': 'Product not found'},
+            {'index': 10, 'message': 'Operation must be an object'},
+            {'index': 11, 'product_id': self.plate, 'message': 'Quantity must be positive'},
+        ])
+
+        expected = {self.lamp: 4, self.kettle: 7, self.plate: 2}
+        self.assertEqual({item['product']['id']: item['quantity'] for item in data['basket']['items']}, expected)
+        # Committed, not just the response
+        self.assertEqual(self.basket_lines(), expected)
+
+    def test_stock_checked_against_basket_quantity(self):
+        # 2 already in the basket: adding 8 reaches the stock of 10, one more does not fit
+        response = self.batch([
+            {'product_id': self.kettle, 'quantity': 8},
+            {'product_id': self.kettle, 'quantity': 1},
+        ])
+
+        data = response.get_json()['data']
+        self.assertEqual(data['applied'], 1)
+        self.assertEqual([error['index'] for error in data['errors']], [1])
+        self.assertEqual(self.basket_lines(), {self.kettle: 10})
+
+    def test_nothing_applied(self):
+        response = self.batch([{'product_id': self.lamp, 'quantity': 6}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['errors'][0]['index'], 0)
+        self.assertEqual(self.basket_lines(), {self.kettle: 2})
+
+    def test_request_shape(self):
+        # A bare list is accepted
+        response = self.client.post('/basket/items:batch', json=[{'product_id': self.lamp}], headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.basket_lines(), {self.kettle: 2, self.lamp: 1})
+
+        self.assertEqual(self.batch([]).status_code, 400)
+
+        self.app.config['BASKET_BATCH_MAX_OPERATIONS'] = 2
+        self.assertEqual(self.batch([{'product_id': self.lamp}] * 3).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from src.repositories.basket_repository import BasketRepository
+from src.repositories.product_repository import ProductRepository
+
+
+class BasketQueryCountTest(unittest.TestCase):
+    """GET /basket must cost the same number of queries for any basket size"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.user = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=str(self.user_id))}'}
+
+        # Warm the principal cache so only basket queries are counted
+        self.client.get('/auth/me', headers=self.headers)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def fill_basket(self, item_count):
+        basket = BasketRepository.get_or_create_basket(self.user_id)
+        for i in range(item_count):
+            product = ProductRepository.create_product(
+                name=f'Product {i}',
+                description='Test product description',
+                price=10.0,
+                stock=100,
+                category='test',
+                image_url=None,
+                created_by=self.user_id
+            )
+            BasketRepository.add_item(basket, product.id, 2)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def count_queries(self, method, url, status=200):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.client.open(url, method=method, headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertEqual(response.status_code, status, response.get_json())
+        return len(statements), response.get_json()
+
+    def test_get_basket_query_count_is_constant(self):
+        self.fill_basket(1)
+        small_count, _ = self.count_queries('GET', '/basket')
+
+        self.fill_basket(29)
+        large_count, data = self.count_queries('GET', '/basket')
+
+        self.assertEqual(data['data']['total_items'], 30)
+        self.assertEqual(data['data']['total_price'], 600.0)
+        self.assertEqual(small_count, large_count)
+        # basket + items JOIN products
+        self.assertLessEqual(large_count, 2)
+
+    def test_failed_checkout_query_count_is_constant(self):
+        self.fill_basket(1)
+        ProductRepository.update_product(1, stock=0)
+        db.session.commit()
+        small_count, _ = self.count_queries('POST', '/basket/checkout', status=409)
+
+        self.fill_basket(19)
+        for product_id in range(1, 21):
+            ProductRepository.update_product(product_id, stock=1)
+        db.session.commit()
+        large_count, data = self.count_queries('POST', '/basket/checkout', status=409)
+
+        # Every short line reported, without reloading its product
+        self.assertEqual(len(data['errors']), 20)
+        self.assertEqual(data['errors'][0]['name'], 'Product 0')
+        self.assertEqual(small_count, large_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
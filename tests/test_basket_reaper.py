@@ -0,0 +1,130 @@
+import unittest
+from datetime import datetime, timedelta
+from src.app import create_app
+from src.database import db
+from src.models.basket import Basket, BasketItem
+from src.models.user import User
+from src.repositories.product_repository import ProductRepository
+from src.services.basket_reaper_service import BasketReaperService
+
+
+class BasketReaperTest(unittest.TestCase):
+    """The reaper abandons stale active baskets, purges old abandoned ones, and leaves the rest"""
+
+    NOW = datetime(2024, 6, 1)
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.owner = User(username='owner', email='owner@example.com', password_hash='x')
+        db.session.add(self.owner)
+        db.session.commit()
+        self.product = ProductRepository.create_product(
+            name='Lamp',
+            description='Test product description',
+            price=10.0,
+            stock=5,
+            category='test',
+            image_url=None,
+            created_by=self.owner.id
+        )
+        db.session.commit()
+        self.users = 0
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def create_baskets(self, count, status, days_ago):
+        """One basket with one line per new user, last touched `days_ago` before NOW"""
+        ids = []
+        for _ in range(count):
+            self.users += 1
+            user = User(username=f'user{self.users}', email=f'user{self.users}@example.com', password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            touched = self.NOW - timedelta(days=days_ago)
+            basket = Basket(user_id=user.id, status=status, created_at=touched, updated_at=touched)
+            basket.items.append(BasketItem(product_id=self.product.id, quantity=1))
+            db.session.add(basket)
+            db.session.flush()
+            ids.append(basket.id)
+        db.session.commit()
+        return ids
+
+    def statuses(self, ids):
+        rows = db.session.execute(db.select(Basket.id, Basket.status).where(Basket.id.in_(ids)))
+        return {basket_id: status for basket_id, status in rows}
+
+    def item_count(self):
+        return db.session.scalar(db.select(db.func.count()).select_from(BasketItem))
+
+    def test_cutoffs_and_batches(self):
+        stale = self.create_baskets(5, 'active', days_ago=20)
+        at_cutoff = self.create_baskets(1, 'active', days_ago=14)
+        fresh = self.create_baskets(2, 'active', days_ago=1)
+        old_abandoned = self.create_baskets(3, 'abandoned', days_ago=40)
+        recent_abandoned = self.create_baskets(1, 'abandoned', days_ago=10)
+        completed = self.create_baskets(1, 'completed', days_ago=100)
+
+        report = BasketReaperService.reap(
+            abandon_after=timedelta(days=14),
+            purge_after=timedelta(days=30),
+            batch_size=2,
+            now=self.NOW
+        )
+
+        # Abandon: 2 + 2 + 1, purge: 2 + 1
+        self.assertEqual(report, {'abandoned': 5, 'purged_baskets': 3, 'purged_items': 3, 'batches': 5})
+
+        kept = stale + at_cutoff + fresh + recent_abandoned + completed
+        self.assertEqual(self.statuses(stale + old_abandoned + at_cutoff + fresh + recent_abandoned + completed), {
+            **{basket_id: 'abandoned' for basket_id in stale + recent_abandoned},
+            **{basket_id: 'active' for basket_id in at_cutoff + fresh},
+            **{basket_id: 'completed' for basket_id in completed},
+        })
+        self.assertEqual(self.item_count(), len(kept))
+
+    def test_just_abandoned_baskets_are_not_purged(self):
+        # Purge age counts from abandonment, not from the last basket activity
+        stale = self.create_baskets(2, 'active', days_ago=60)
+
+        report = BasketReaperService.reap(
+            abandon_after=timedelta(days=14),
+            purge_after=timedelta(days=30),
+            now=self.NOW
+        )
+
+        self.assertEqual(report['abandoned'], 2)
+        self.assertEqual(report['purged_baskets'], 0)
+        self.assertEqual(set(self.statuses(stale).values()), {'abandoned'})
+
+    def test_exact_batch_multiple(self):
+        self.create_baskets(4, 'active', days_ago=20)
+
+        report = BasketReaperService.reap(abandon_after=timedelta(days=14), batch_size=2, now=self.NOW)
+
+        # Two full batches, then an empty one to see nothing is left
+        self.assertEqual(report, {'abandoned': 4, 'purged_baskets': 0, 'purged_items': 0, 'batches': 3})
+
+    def test_from_config(self):
+        old_abandoned = self.create_baskets(1, 'abandoned', days_ago=40)
+        self.create_baskets(1, 'active', days_ago=20)
+
+        # Purging is off by default
+        self.app.config['BASKET_ABANDON_AFTER_DAYS'] = 14
+        self.app.config['BASKET_PURGE_AFTER_DAYS'] = 0
+        report = BasketReaperService.reap_from_config(self.app)
+        self.assertEqual((report['abandoned'], report['purged_baskets']), (1, 0))
+        self.assertEqual(self.statuses(old_abandoned), {old_abandoned[0]: 'abandoned'})
+
+        self.app.config['BASKET_PURGE_AFTER_DAYS'] = 30
+        report = BasketReaperService.reap_from_config(self.app)
+        self.assertEqual((report['abandoned'], report['purged_baskets']), (0, 1))
+        self.assertEqual(self.statuses(old_abandoned), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
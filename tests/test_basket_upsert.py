@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+from src.app import create_app
+from src.database import db
+from src.models.basket import BasketItem
+from src.models.user import User
+from src.repositories import basket_repository
+from src.repositories.basket_repository import BasketRepository
+from src.repositories.product_repository import ProductRepository
+
+
+class BasketUpsertTest(unittest.TestCase):
+    """add_items merges into existing lines instead of inserting a second row"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.user = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+
+        self.lamp = self.create_product('Lamp')
+        self.kettle = self.create_product('Kettle')
+        self.mug = self.create_product('Mug')
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def create_product(self, name):
+        product = ProductRepository.create_product(
+            name=name,
+            description='Test product description',
+            price=10.0,
+            stock=50,
+            category='test',
+            image_url=None,
+            created_by=self.user_id
+        )
+        db.session.commit()
+        return product.id
+
+    def stored_lines(self, basket_id):
+        rows = db.session.execute(
+            db.select(BasketItem.id, BasketItem.product_id, BasketItem.quantity)
+            .where(BasketItem.basket_id == basket_id)
+        )
+        return {product_id: (item_id, quantity) for item_id, product_id, quantity in rows}
+
+    def test_existing_line_is_merged(self):
+        # The multi-row upsert, and the plain ORM path for other databases
+        for upsert in (True, False):
+            with self.subTest(upsert=upsert), mock.patch.dict(basket_repository._UPSERT_INSERTS, clear=not upsert):
+                basket = BasketRepository.get_or_create_basket(self.user_id, with_items=True)
+                basket.items.clear()
+                db.session.commit()
+                kettle, _ = BasketRepository.add_item(basket, self.kettle, 2)
+                db.session.commit()
+                kettle_id = kettle.id
+
+                items = BasketRepository.add_items(basket, {self.kettle: 3, self.lamp: 1})
+
+                self.assertIs(items[self.kettle], kettle)
+                self.assertEqual(kettle.quantity, 5)
+                self.assertIsNotNone(items[self.lamp].id)
+                self.assertEqual(sorted(item.product_id for item in basket.items), sorted([self.kettle, self.lamp]))
+                db.session.commit()
+
+                self.assertEqual(self.stored_lines(basket.id), {
+                    self.kettle: (kettle_id, 5),
+                    self.lamp: (items[self.lamp].id, 1),
+                })
+
+    def test_add_item_reports_created(self):
+        basket = BasketRepository.get_or_create_basket(self.user_id, with_items=True)
+
+        _, created = BasketRepository.add_item(basket, self.mug, 1)
+        self.assertTrue(created)
+        item, created = BasketRepository.add_item(basket, self.mug, 2)
+        self.assertFalse(created)
+        self.assertEqual(item.quantity, 3)
+        db.session.commit()
+
+        self.assertEqual([quantity for _, quantity in self.stored_lines(basket.id).values()], [3])
+
+    def test_line_written_behind_loaded_basket(self):
+        basket = BasketRepository.get_or_create_basket(self.user_id, with_items=True)
+        db.session.commit()
+        self.assertEqual(basket.items, [])
+
+        # Another request adds the line after this basket was loaded
+        db.session.execute(db.insert(BasketItem).values(basket_id=basket.id, product_id=self.mug, quantity=4))
+
+        items = BasketRepository.add_items(basket, {self.mug: 1})
+        db.session.commit()
+
+        # Merged by the ON CONFLICT clause: one row, quantities summed
+        lines = self.stored_lines(basket.id)
+        self.assertEqual(lines, {self.mug: (items[self.mug].id, 5)})
+        self.assertEqual([item.quantity for item in basket.items], [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from src.app import create_app
+from src.database import db
+from src.models.category import Category
+from src.models.user import User
+from src.repositories.category_repository import CategoryRepository
+from src.repositories.product_repository import ProductRepository
+
+
+class CategoryCountTest(unittest.TestCase):
+    """Category counts follow product writes and can be rebuilt after drift"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        admin = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        self.admin_id = admin.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def create_product(self, name, stock, category):
+        product = ProductRepository.create_product(
+            name=name,
+            description='Test product description',
+            price=10.0,
+            stock=stock,
+            category=category,
+            image_url=None,
+            created_by=self.admin_id
+        )
+        db.session.commit()
+        return product.id
+
+    def counts(self):
+        db.session.expire_all()
+        return {c.name: (c.product_count, c.in_stock_count) for c in Category.query}
+
+    def test_counts_follow_orm_and_bulk_writes(self):
+        lamp_id = self.create_product('Lamp', 3, 'home')
+        self.create_product('Kettle', 0, 'kitchen')
+        self.assertEqual(self.counts(), {'home': (1, 1), 'kitchen': (1, 0)})
+
+        ProductRepository.update_product(lamp_id, category='kitchen')
+        ProductRepository.bulk_save([{
+            'name': 'Mug', 'description': None, 'price': 4.0, 'stock': 2, 'category': 'kitchen', 'image_url': None
+        }], self.admin_id)
+        db.session.commit()
+        self.assertEqual(self.counts(), {'home': (0, 0), 'kitchen': (3, 2)})
+
+        ok, _ = ProductRepository.reserve_stock({lamp_id: 3})
+        db.session.commit()
+        self.assertTrue(ok)
+        self.assertEqual(self.counts(), {'home': (0, 0), 'kitchen': (3, 1)})
+
+    def test_recount_repairs_drift(self):
+        self.create_product('Lamp', 3, 'home')
+        self.create_product('Kettle', 0, 'kitchen')
+        # Raw SQL bypasses the mapper events
+        db.session.execute(db.text("UPDATE products SET category = 'garden', stock = 0 WHERE name = 'Lamp'"))
+        db.session.commit()
+
+        CategoryRepository.recount()
+        db.session.commit()
+
+        self.assertEqual(self.counts(), {'home': (0, 0), 'kitchen': (1, 0), 'garden': (1, 0)})
+        self.assertEqual([c.name for c in CategoryRepository.get_categories()], ['garden', 'kitchen'])
+
+
+if __name__ == '__main__':
+    unittest.main()
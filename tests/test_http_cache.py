@@ -0,0 +1,67 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from src.repositories.product_repository import ProductRepository
+
+
+class CatalogETagTest(unittest.TestCase):
+    """Catalog ETags hold until the body changes, stock taken by checkouts included"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.user = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=str(self.user_id))}'}
+
+        product = ProductRepository.create_product(
+            name='Desk lamp',
+            description='Test product description',
+            price=20.0,
+            stock=10,
+            category='test',
+            image_url=None,
+            created_by=self.user_id
+        )
+        db.session.commit()
+        self.product_id = product.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_checkout_moves_etag(self):
+        for url in ('/products', f'/products/{self.product_id}'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response.headers['ETag']
+                self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+                self.client.post('/basket/add', json={'product_id': self.product_id}, headers=self.headers)
+                response = self.client.post('/basket/checkout', headers=self.headers)
+                self.assertEqual(response.status_code, 200, response.get_json())
+
+                response = self.revalidate(url, etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/products?per_page=1').headers['ETag']
+        second = self.client.get('/products?per_page=2').headers['ETag']
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.revalidate('/products?per_page=1', first).status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
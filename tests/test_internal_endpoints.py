@@ -0,0 +1,52 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+
+
+class InternalEndpointTest(unittest.TestCase):
+    """Endpoints exposing internals need an admin JWT or an API key"""
+
+    URLS = ('/health/database', '/metrics')
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.config['API_KEYS'] = ['scrape-key']
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        admin = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+        shopper = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add_all([admin, shopper])
+        db.session.commit()
+        self.admin_headers = self.auth(admin.id)
+        self.shopper_headers = self.auth(shopper.id)
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def auth(self, user_id):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    def test_access(self):
+        cases = [
+            ({}, 401),
+            ({'X-API-Key': 'wrong'}, 401),
+            (self.shopper_headers, 403),
+            (self.admin_headers, 200),
+            ({'X-API-Key': 'scrape-key'}, 200),
+        ]
+        for url in self.URLS:
+            for headers, status in cases:
+                with self.subTest(url=url, headers=headers):
+                    self.assertEqual(self.client.get(url, headers=headers).status_code, status)
+
+    def test_liveness_stays_public(self):
+        self.assertEqual(self.client.get('/health').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from flask import Flask
+from src.config import config
+from src.database import db, init_db
+from src.migrations import LATEST_VERSION, create_schema, get_schema_version, migrate
+
+# Schema of databases created before versioned migrations (version 0)
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, username VARCHAR(80) NOT NULL, email VARCHAR(120) NOT NULL,
+    password_hash VARCHAR(128) NOT NULL, role VARCHAR(50) NOT NULL, created_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_username ON users (username);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE products (
+    id INTEGER NOT NULL, name VARCHAR(120) NOT NULL, description TEXT, price FLOAT NOT NULL,
+    stock INTEGER NOT NULL, category VARCHAR(50), image_url VARCHAR(255),
+    created_by INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(created_by) REFERENCES users (id)
+);
+CREATE INDEX ix_products_category ON products (category);
+CREATE INDEX ix_products_name ON products (name);
+CREATE TABLE baskets (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL,
+    created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE basket_items (
+    id INTEGER NOT NULL, basket_id INTEGER NOT NULL, product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL, added_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(basket_id) REFERENCES baskets (id),
+    FOREIGN KEY(product_id) REFERENCES products (id)
+);
+
+INSERT INTO users VALUES (1, 'admin', 'admin@example.com', 'x', 'admin', '2024-01-01 00:00:00.000000');
+INSERT INTO users VALUES (2, 'shopper', 'shopper@example.com', 'x', 'user', '2024-01-01 00:00:00.000000');
+INSERT INTO products VALUES (1, 'Desk lamp', 'Warm light', 20.0, 5, 'home', NULL, 1,
+                             '2024-01-01 00:00:00.000000', '2024-01-01 00:00:00.000000');
+INSERT INTO products VALUES (2, 'Kettle', 'Steel', 35.5, 0, 'kitchen', NULL, 1,
+                             '2024-01-01 00:00:00.000000', '2024-01-01 00:00:00.000000');
+INSERT INTO baskets VALUES (1, 2, 'completed', '2024-01-02 00:00:00.000000', '2024-01-02 01:00:00.000000');
+INSERT INTO baskets VALUES (2, 2, 'active', '2024-01-03 00:00:00.000000', '2024-01-03 00:00:00.000000');
+INSERT INTO basket_items VALUES (1, 1, 1, 2, '2024-01-02 00:00:00.000000');
+INSERT INTO basket_items VALUES (2, 1, 2, 1, '2024-01-02 00:00:00.000000');
+INSERT INTO basket_items VALUES (3, 2, 1, 1, '2024-01-03 00:00:00.000000');
+INSERT INTO basket_items VALUES (4, 2, 1, 3, '2024-01-03 00:00:00.000000');
+"""
+
+
+class LegacyUpgradeTest(unittest.TestCase):
+    """A version-0 database upgrades to the latest schema with its data intact"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        with sqlite3.connect(self.path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+        self.app = Flask(__name__)
+        self.app.config.from_object(config['testing'])
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{self.path}'
+        init_db(self.app, check_schema=False)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        os.remove(self.path)
+
+    def query(self, sql):
+        return db.session.execute(db.text(sql)).all()
+
+    def test_upgrade_from_version_0(self):
+        self.assertEqual(get_schema_version(), 0)
+
+        applied = migrate(log=lambda message: None)
+
+        self.assertEqual([version for version, _ in applied], list(range(1, LATEST_VERSION + 1)))
+        self.assertEqual(get_schema_version(), LATEST_VERSION)
+
+        # 3: categories backfilled from products
+        self.assertEqual(
+            self.query('SELECT name, product_count, in_stock_count FROM categories ORDER BY name'),
+            [('home', 1, 1), ('kitchen', 1, 0)]
+        )
+        # 4: completed basket snapshotted at current prices
+        self.assertEqual(
+            self.query('SELECT id, user_id, total_items, total_quantity, total_price FROM orders'),
+            [(1, 2, 2, 3, 75.5)]
+        )
+        self.assertEqual(
+            self.query('SELECT product_name, unit_price, quantity, subtotal FROM order_lines ORDER BY product_id'),
+            [('Desk lamp', 20.0, 2, 40.0), ('Kettle', 35.5, 1, 35.5)]
+        )
+        # 6: duplicate lines merged into the oldest one
+        self.assertEqual(
+            self.query('SELECT id, quantity FROM basket_items WHERE basket_id = 2'),
+            [(3, 4)]
+        )
+        # 7: products are unsharded, shard table exists
+        self.assertEqual(self.query('SELECT DISTINCT stock_shards FROM products'), [(0,)])
+        self.assertEqual(self.query('SELECT COUNT(*) FROM product_stock_shards'), [(0,)])
+        # 8: catalog version row seeded
+        self.assertEqual(self.query('SELECT id, version FROM catalog_version'), [(1, 1)])
+        # 9: the ordered basket's lines are gone, the active basket keeps its line
+        self.assertEqual(self.query('SELECT id, basket_id FROM basket_items'), [(3, 2)])
+
+        # Running again is a no-op
+        self.assertEqual(migrate(log=lambda message: None), [])
+
+
+
+def describe_schema():
+    """{table: (columns, indexes)} of the bound database"""
+    inspector = db.inspect(db.engine)
+    return {
+        table: (
+            sorted(column['name'] for column in inspector.get_columns(table)),
+            sorted((index['name'], tuple(index['column_names']), bool(index['unique']))
+                   for index in inspector.get_indexes(table))
+        )
+        for table in inspector.get_table_names()
+    }
+
+
+class FreshSchemaTest(unittest.TestCase):
+    """Replaying every migration and create_schema build the same database"""
+
+    def build(self, upgrade):
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        app = Flask(__name__)
+        app.config.from_object(config['testing'])
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+        init_db(app, check_schema=False)
+        try:
+            with app.app_context():
+                upgrade(log=lambda message: None)
+                schema = describe_schema()
+                version = get_schema_version()
+                catalog = db.session.execute(db.text('SELECT id, version FROM catalog_version')).all()
+                db.session.remove()
+                db.engine.dispose()
+        finally:
+            os.remove(path)
+        return schema, version, catalog
+
+    def test_create_schema_matches_migrations(self):
+        migrated = self.build(migrate)
+        created = self.build(create_schema)
+
+        self.assertEqual(created[1], LATEST_VERSION)
+        self.assertEqual(created, migrated)
+
+
+if __name__ == '__main__':
+    unittest.main()
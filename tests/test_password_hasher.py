@@ -0,0 +1,61 @@
+import threading
+import unittest
+from src.app import create_app
+from src.database import db
+from src.utils.password_hasher import PASSWORD_HASHER_KEY, PasswordHasher, PasswordHasherBusy
+
+
+class PasswordHasherTest(unittest.TestCase):
+    """Bounded bcrypt pool: full queue and timeouts both mean 'busy'"""
+
+    def setUp(self):
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def occupy(self, hasher):
+        # Keep the only worker busy until the test ends
+        thread = threading.Thread(target=hasher._run, args=('hash', self.release.wait))
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_zero_queue_rejects_while_worker_busy(self):
+        hasher = PasswordHasher(rounds=4, workers=1, queue_size=0, timeout=5)
+        self.addCleanup(hasher.shutdown)
+        self.occupy(hasher)
+
+        with self.assertRaisesRegex(PasswordHasherBusy, 'queue is full'):
+            hasher.hash('secret')
+
+    def test_timeout_is_busy(self):
+        hasher = PasswordHasher(rounds=4, workers=1, queue_size=1, timeout=0.05)
+        self.addCleanup(hasher.shutdown)
+        self.occupy(hasher)
+
+        with self.assertRaisesRegex(PasswordHasherBusy, 'timed out'):
+            hasher.hash('secret')
+
+        # The timed out hash gave its queue slot back
+        self.release.set()
+        self.assertTrue(hasher.verify(hasher.hash('secret'), 'secret'))
+
+    def test_signup_timeout_returns_503(self):
+        app = create_app('testing')
+        hasher = PasswordHasher(rounds=4, workers=1, queue_size=1, timeout=0.05)
+        app.extensions[PASSWORD_HASHER_KEY] = hasher
+        self.addCleanup(hasher.shutdown)
+        self.occupy(hasher)
+
+        with app.app_context():
+            response = app.test_client().post('/auth/signup', json={
+                'username': 'shopper', 'email': 'shopper@example.com', 'password': 'secret123'
+            })
+            db.session.remove()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
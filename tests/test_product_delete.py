@@ -0,0 +1,73 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.database import db
+from src.models.basket import BasketItem
+from src.models.user import User
+from src.repositories.basket_repository import BasketRepository
+from src.repositories.product_repository import ProductRepository
+
+
+class ProductDeleteTest(unittest.TestCase):
+    """Deleting a product that was ordered or is in a basket keeps orders readable"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        admin = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+        shopper = User(username='shopper', email='shopper@example.com', password_hash='x')
+        other = User(username='other', email='other@example.com', password_hash='x')
+        db.session.add_all([admin, shopper, other])
+        db.session.commit()
+        self.admin_headers = self.auth(admin.id)
+        self.headers = self.auth(shopper.id)
+        self.other_id = other.id
+
+        product = ProductRepository.create_product(
+            name='Desk lamp',
+            description='Test product description',
+            price=20.0,
+            stock=10,
+            category='test',
+            image_url=None,
+            created_by=admin.id
+        )
+        db.session.commit()
+        self.product_id = product.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def auth(self, user_id):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    def test_delete_ordered_product(self):
+        self.client.post('/basket/add', json={'product_id': self.product_id, 'quantity': 2}, headers=self.headers)
+        response = self.client.post('/basket/checkout', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        order_id = response.get_json()['data']['order']['id']
+
+        # Still in someone else's active basket
+        BasketRepository.add_item(BasketRepository.get_or_create_basket(self.other_id), self.product_id, 1)
+        db.session.commit()
+
+        response = self.client.delete(f'/products/{self.product_id}', headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(BasketItem.query.filter_by(product_id=self.product_id).count(), 0)
+
+        response = self.client.get(f'/basket/orders/{order_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        order = response.get_json()['data']['order']
+        self.assertEqual(order['total_price'], 40.0)
+        self.assertEqual(
+            [(line['product_id'], line['product_name'], line['quantity']) for line in order['items']],
+            [(self.product_id, 'Desk lamp', 2)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import gzip
+import json
+import unittest
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from src.repositories.product_repository import ProductRepository
+from src.services.product_service import ProductService
+
+
+class ProductExportTest(unittest.TestCase):
+    """GET /products/export streams NDJSON, gzipped on request, filtered by updated_since"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.config['API_KEYS'] = ['partner-key']
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        admin = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        self.admin_headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+
+        ProductRepository.bulk_save([
+            {
+                'name': f'Product {i}',
+                'description': 'Test product description',
+                'price': 10.0 + i,
+                'stock': i,
+                'category': 'test',
+                'image_url': None,
+                'created_at': datetime(2024, 1, 1),
+                'updated_at': datetime(2024, 1, 1 + i)
+            }
+            for i in range(5)
+        ], admin.id)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def export(self, query='', headers=None):
+        return self.client.get(f'/products/export{query}', headers=headers or {'X-API-Key': 'partner-key'})
+
+    def lines(self, body):
+        return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+    def test_ndjson(self):
+        response = self.export(headers=self.admin_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertNotIn('Content-Encoding', response.headers)
+        products = self.lines(response.data)
+        self.assertEqual([product['name'] for product in products], [f'Product {i}' for i in range(5)])
+        # Same fields as GET /products/<id>
+        detail = self.client.get(f"/products/{products[2]['id']}").get_json()['data']['product']
+        self.assertEqual(products[2], detail)
+
+    def test_gzip(self):
+        plain = self.export().data
+
+        for query, headers in (('?gzip=1', None), ('', {'X-API-Key': 'partner-key', 'Accept-Encoding': 'gzip'})):
+            with self.subTest(query=query, headers=headers):
+                response = self.export(query, headers)
+                self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+                self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+                self.assertEqual(gzip.decompress(response.data), plain)
+
+    def test_updated_since(self):
+        cases = {
+            '2024-01-03T00:00:00': ['Product 2', 'Product 3', 'Product 4'],
+            '2024-01-03T00:00:00Z': ['Product 2', 'Product 3', 'Product 4'],
+            # 02:00 at UTC+02:00 is midnight UTC
+            '2024-01-05T02:00:00%2B02:00': ['Product 4'],
+            '2030-01-01': [],
+        }
+        for since, names in cases.items():
+            with self.subTest(since=since):
+                response = self.export(f'?updated_since={since}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([product['name'] for product in self.lines(response.data)], names)
+
+        self.assertEqual(self.export('?updated_since=yesterday').status_code, 400)
+
+    def test_chunks_are_whole_lines(self):
+        chunks = list(ProductService.export_products(chunk_size=2))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(all(chunk.endswith(b'\n') for chunk in chunks))
+        self.assertEqual(b''.join(chunks), self.export().data)
+
+    def test_auth(self):
+        self.assertEqual(self.export(headers={'X-API-Key': 'wrong'}).status_code, 401)
+        self.assertEqual(self.client.get('/products/export').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from src.repositories.product_repository import ProductRepository
+
+
+class ProductPaginationTest(unittest.TestCase):
+    """Listing pages cover the catalog exactly once, even when created_at ties"""
+
+    PRODUCTS = 25
+    SINGLES = 3
+    PER_PAGE = 7
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        admin = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+
+        # One import chunk: every row gets the same created_at, newer than
+        # the products created one by one afterwards
+        tied_at = datetime.utcnow() + timedelta(days=1)
+        ProductRepository.bulk_save([
+            {
+                'name': f'Product {i}',
+                'description': 'Test product description',
+                'price': 10.0,
+                'stock': 5,
+                'category': 'test' if i % 2 else 'other',
+                'image_url': None,
+                'created_at': tied_at,
+                'updated_at': tied_at
+            }
+            for i in range(self.PRODUCTS)
+        ], admin.id)
+        for i in range(self.SINGLES):
+            ProductRepository.create_product(
+                name=f'Single {i}',
+                description='Test product description',
+                price=10.0,
+                stock=5,
+                category='test',
+                image_url=None,
+                created_by=admin.id
+            )
+        db.session.commit()
+
+        self.ids = self.expected_ids()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def expected_ids(self, category=None):
+        query = 'SELECT id FROM products'
+        if category:
+            query += f" WHERE category = '{category}'"
+        return [row[0] for row in db.session.execute(db.text(query + ' ORDER BY created_at DESC, id DESC'))]
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()['data']
+
+    def test_offset_pages_with_tied_created_at(self):
+        seen = []
+        page = 1
+        while True:
+            data = self.get(f'/products?page={page}&per_page={self.PER_PAGE}')
+            seen.extend(product['id'] for product in data['products'])
+            if not data['has_next']:
+                break
+            page += 1
+
+        self.assertEqual(page, 4)
+        self.assertEqual(seen, self.ids)
+
+    def test_cursor_pages_with_tied_created_at(self):
+        for category in (None, 'test'):
+            with self.subTest(category=category):
+                url = f'/products?per_page={self.PER_PAGE}&with_total=1'
+                if category:
+                    url += f'&category={category}'
+                expected = self.expected_ids(category)
+
+                seen = []
+                cursor = ''
+                while True:
+                    data = self.get(f'{url}&cursor={quote(cursor)}')
+                    self.assertEqual(data['total'], len(expected))
+                    seen.extend(product['id'] for product in data['products'])
+                    if not data['has_next']:
+                        self.assertIsNone(data['next_cursor'])
+                        break
+                    cursor = data['next_cursor']
+
+                # No duplicates, no gaps, same order as the offset listing
+                self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/products?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
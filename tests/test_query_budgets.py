@@ -0,0 +1,131 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from benchmarks import datagen
+from src.app import create_app
+from src.database import db
+from src.models.user import User
+from tests.query_budget import QueryBudget, QueryBudgetTestCase, QueryCounter
+
+# Same budgets apply to every dataset size, so a query that runs once per
+# row (N+1) blows the budget on the large dataset even if it fits the small one.
+DATASET_SIZES = {
+    'small': dict(users=2, products=20, categories=3, orders_per_user=2, items_per_basket=2),
+    'large': dict(users=4, products=500, categories=12, orders_per_user=30, items_per_basket=25),
+}
+
+
+def _add_first_product(case):
+    case.request('POST', '/basket/add', auth='user', json={'product_id': case.product_id, 'quantity': 1})
+
+
+# Principal cache is warm (as in steady state), so auth lookups are not counted.
+# Basket writes include one UPDATE of baskets.updated_at (activity for the reaper).
+# A batch writes all its new lines with one multi-row upsert and all changed
+# existing lines with one executemany UPDATE, however many lines it has.
+BUDGETS = [
+    QueryBudget('GET', '/auth/me', 0, auth='user'),
+    QueryBudget('POST', '/auth/login', 1, json={'username': 'bench_user_0', 'password': datagen.PASSWORD}),
+
+    QueryBudget('GET', '/products', 3),
+    QueryBudget('GET', '/products?per_page=50&category=category-01', 3),
+    QueryBudget('GET', '/products?search=lamp', 3),
+    QueryBudget('GET', '/products?cursor=&per_page=50', 2),
+    QueryBudget('GET', '/products/{product_id}', 2),
+    QueryBudget('GET', '/products/categories', 2),
+    QueryBudget('GET', '/products/categories?with_counts=1', 2),
+    QueryBudget('PUT', '/products/{product_id}', 3, auth='admin', json={'price': 12.5}),
+
+    QueryBudget('GET', '/basket', 1, auth='user'),
+    QueryBudget('POST', '/basket/add', 4, auth='user', json={'product_id': '{product_id}', 'quantity': 1}),
+    QueryBudget('PUT', '/basket/update', 3, auth='user', json={'product_id': '{product_id}', 'quantity': 3},
+                setup=_add_first_product),
+    QueryBudget('DELETE', '/basket/remove/{product_id}', 3, auth='user', setup=_add_first_product),
+    QueryBudget('POST', '/basket/items:batch', 4, auth='user', json={'operations': [
+        {'product_id': '{product_id}', 'quantity': 2, 'op': 'add'},
+        {'product_id': '{product_id}', 'quantity': 5, 'op': 'set'},
+    ]}),
+    QueryBudget('POST', '/basket/items:batch', 5, auth='user', name='20 lines', json=lambda case: {
+        'operations': [{'product_id': product_id, 'quantity': 1} for product_id in case.product_ids[:20]]
+    }),
+    QueryBudget('GET', '/basket/orders', 1, auth='user'),
+    QueryBudget('GET', '/basket/orders/{order_id}', 2, auth='user'),
+    # One executemany DELETE drops the checked-out lines, whatever the basket size
+    QueryBudget('POST', '/basket/checkout', 9, auth='user'),
+    QueryBudget('DELETE', '/basket/clear', 3, auth='user', setup=_add_first_product),
+]
+
+
+def _fill(value, case):
+    if callable(value):
+        return value(case)
+    if isinstance(value, str):
+        if value == '{product_id}':
+            return case.product_id
+        return value.format(product_id=case.product_id, order_id=case.order_id)
+    if isinstance(value, list):
+        return [_fill(item, case) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, case) for key, item in value.items()}
+    return value
+
+
+class QueryBudgetTest(QueryBudgetTestCase):
+    """Every budgeted endpoint stays within its query budget at every dataset size"""
+
+    def seed(self, size):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            dataset = datagen.generate(seed=7, **DATASET_SIZES[size])
+            user = User.query.filter_by(username=dataset.usernames[0]).first()
+            admin = User.query.filter_by(username=dataset.admin_username).first()
+            self.headers = {
+                'user': {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'},
+                'admin': {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'},
+            }
+
+        self.product_ids = dataset.product_ids
+        self.product_id = dataset.product_ids[-1]
+        self.order_id = dataset.order_ids[dataset.usernames[0]][-1]
+
+        # Warm the principal cache for both accounts
+        for headers in self.headers.values():
+            self.client.get('/auth/me', headers=headers)
+
+    def request(self, method, path, auth=None, json=None):
+        return self.client.open(path, method=method, json=json, headers=self.headers.get(auth, {}))
+
+    def check_budget(self, budget):
+        if budget.setup:
+            budget.setup(self)
+
+        path = _fill(budget.path, self)
+        with QueryCounter(self.engine) as queries:
+            response = self.request(budget.method, path, auth=budget.auth, json=_fill(budget.json, self))
+
+        self.assertEqual(response.status_code, budget.status, response.get_data(as_text=True))
+        self.assertQueryBudget(queries, budget.max_queries, budget.label)
+        return queries.count
+
+    def test_query_budgets(self):
+        counts = {}
+        for size in DATASET_SIZES:
+            self.seed(size)
+            with self.app.app_context():
+                self.engine = db.engine
+
+            for budget in BUDGETS:
+                with self.subTest(size=size, endpoint=budget.label):
+                    counts.setdefault(budget.label, {})[size] = self.check_budget(budget)
+
+        for label, by_size in counts.items():
+            with self.subTest(endpoint=label):
+                self.assertEqual(
+                    len(set(by_size.values())), 1,
+                    f'{label} query count depends on data size: {by_size}'
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from src.app import create_app
+from src.middleware.proxy import init_proxy_fix
+from src.middleware.rate_limit import init_rate_limiter
+
+
+class RateLimitTest(unittest.TestCase):
+    """Auth rate limits: scopes don't drain each other, proxies are trusted only when configured"""
+
+    def make_client(self, ip='3/minute', username='1/minute', proxies=0):
+        app = create_app('testing')
+        app.config.update(
+            RATE_LIMIT_ENABLED=True,
+            RATE_LIMIT_STORAGE='memory',
+            RATE_LIMITS={'auth': {'methods': ['POST'], 'ip': ip, 'username': username}},
+            PROXY_FIX_X_FOR=proxies,
+        )
+        init_proxy_fix(app)
+        init_rate_limiter(app)
+        return app.test_client()
+
+    def login(self, client, username, forwarded_for=None):
+        headers = {'X-Forwarded-For': forwarded_for} if forwarded_for else {}
+        response = client.post('/auth/login', json={'username': username, 'password': 'wrong'}, headers=headers)
+        return response.status_code
+
+    def test_username_denial_does_not_drain_ip_bucket(self):
+        client = self.make_client(ip='3/minute', username='1/minute')
+
+        self.assertNotEqual(self.login(client, 'alice'), 429)
+        # Denied by the username scope: the IP keeps its two remaining tokens
+        self.assertEqual(self.login(client, 'alice'), 429)
+        self.assertEqual(self.login(client, 'alice'), 429)
+        self.assertNotEqual(self.login(client, 'bob'), 429)
+        self.assertNotEqual(self.login(client, 'carol'), 429)
+        self.assertEqual(self.login(client, 'dave'), 429)
+
+    def test_ip_denial_does_not_drain_username_bucket(self):
+        client = self.make_client(ip='1/minute', username='1/minute', proxies=1)
+
+        self.assertNotEqual(self.login(client, 'bob', forwarded_for='10.0.0.1'), 429)
+        self.assertEqual(self.login(client, 'alice', forwarded_for='10.0.0.1'), 429)
+        # alice's token was not spent by the request the IP scope denied
+        self.assertNotEqual(self.login(client, 'alice', forwarded_for='10.0.0.2'), 429)
+
+    def test_forwarded_for_used_behind_trusted_proxy(self):
+        client = self.make_client(ip='1/minute', username='100/minute', proxies=1)
+
+        self.assertNotEqual(self.login(client, 'alice', forwarded_for='10.0.0.1'), 429)
+        self.assertNotEqual(self.login(client, 'bob', forwarded_for='10.0.0.2'), 429)
+        self.assertEqual(self.login(client, 'carol', forwarded_for='10.0.0.1'), 429)
+
+    def test_forwarded_for_ignored_without_proxy(self):
+        client = self.make_client(ip='1/minute', username='100/minute', proxies=0)
+
+        self.assertNotEqual(self.login(client, 'alice', forwarded_for='10.0.0.1'), 429)
+        # Spoofed header: still the same socket address, same bucket
+        self.assertEqual(self.login(client, 'bob', forwarded_for='10.0.0.2'), 429)
+
+
+if __name__ == '__main__':
+    unittest.main()
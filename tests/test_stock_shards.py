@@ -0,0 +1,234 @@
+import os
+import tempfile
+import threading
+import unittest
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import OperationalError
+from src.app import create_app
+from src.config import config
+from src.database import db, init_db
+from src.migrations import migrate
+from src.models.category import Category
+from src.models.product import Product
+from src.models.stock_shard import StockShard
+from src.models.user import User
+from src.repositories import stock_shard_repository
+from src.repositories.basket_repository import BasketRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.stock_shard_repository import StockShardRepository
+
+
+def create_product(user_id, name, stock, shards=0):
+    product = ProductRepository.create_product(
+        name=name,
+        description='Test product description',
+        price=10.0,
+        stock=stock,
+        category='test',
+        image_url=None,
+        created_by=user_id
+    )
+    if shards:
+        StockShardRepository.reshard(product, shards)
+    db.session.commit()
+    return product.id
+
+
+def shard_stock(product_id):
+    return db.session.execute(
+        db.select(StockShard.stock).where(StockShard.product_id == product_id).order_by(StockShard.shard)
+    ).scalars().all()
+
+
+def cached_stock(product_id):
+    return db.session.execute(db.select(Product.stock).where(Product.id == product_id)).scalar()
+
+
+class StockShardTest(unittest.TestCase):
+    """Sharded products: split, checkout decrements, cached total and reporting"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        stock_shard_repository._last_sync.clear()
+
+        self.user = User(username='shopper', email='shopper@example.com', password_hash='x')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=str(self.user_id))}'}
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+
+    def reserve(self, product_id, quantity):
+        ok, stock = ProductRepository.reserve_stock({product_id: quantity})
+        if ok:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return ok, stock
+
+    def test_reshard_splits_and_merges_stock(self):
+        product_id = create_product(self.user_id, 'Lamp', 10, shards=4)
+        self.assertEqual(shard_stock(product_id), [3, 3, 2, 2])
+
+        self.reserve(product_id, 3)
+        StockShardRepository.reshard(db.session.get(Product, product_id), 0)
+        db.session.commit()
+
+        self.assertEqual(shard_stock(product_id), [])
+        self.assertEqual(cached_stock(product_id), 7)
+
+    def test_restock_redistributes_over_shards(self):
+        product_id = create_product(self.user_id, 'Lamp', 10, shards=4)
+
+        ProductRepository.update_product(product_id, stock=7)
+        db.session.commit()
+
+        self.assertEqual(shard_stock(product_id), [2, 2, 2, 1])
+        self.assertEqual(cached_stock(product_id), 7)
+
+    def test_checkout_takes_from_one_shard(self):
+        product_id = create_product(self.user_id, 'Lamp', 12, shards=4)
+
+        ok, stock = self.reserve(product_id, 2)
+
+        self.assertTrue(ok)
+        self.assertEqual(stock[product_id], 10)
+        self.assertEqual(sorted(shard_stock(product_id)), [1, 3, 3, 3])
+
+    def test_checkout_drains_several_shards(self):
+        product_id = create_product(self.user_id, 'Lamp', 10, shards=4)
+
+        ok, stock = self.reserve(product_id, 5)
+        self.assertTrue(ok)
+        self.assertEqual(sum(shard_stock(product_id)), 5)
+
+        ok, stock = self.reserve(product_id, 6)
+        self.assertFalse(ok)
+        self.assertEqual(stock[product_id], 5)
+        self.assertEqual(sum(shard_stock(product_id)), 5)
+
+    def test_cached_total_is_throttled_until_sold_out(self):
+        self.app.config['STOCK_SHARD_SYNC_INTERVAL'] = 3600
+        product_id = create_product(self.user_id, 'Lamp', 4, shards=2)
+        in_stock = lambda: Category.query.filter_by(name='test').one().in_stock_count
+        self.assertEqual(in_stock(), 1)
+
+        self.reserve(product_id, 1)
+        self.assertEqual(cached_stock(product_id), 3)
+
+        # Within the interval the products row is not written
+        self.reserve(product_id, 1)
+        self.assertEqual(cached_stock(product_id), 3)
+        self.assertEqual(sum(shard_stock(product_id)), 2)
+
+        # Selling out always syncs, and flips the in-stock counts
+        self.reserve(product_id, 2)
+        self.assertEqual(cached_stock(product_id), 0)
+        self.assertEqual(in_stock(), 0)
+        self.assertFalse(db.session.get(Product, product_id).is_in_stock())
+
+    def test_rolled_back_sync_does_not_throttle(self):
+        self.app.config['STOCK_SHARD_SYNC_INTERVAL'] = 3600
+        product_id = create_product(self.user_id, 'Lamp', 4, shards=2)
+
+        ok, _ = ProductRepository.reserve_stock({product_id: 1})
+        self.assertTrue(ok)
+        db.session.rollback()
+        self.assertEqual(cached_stock(product_id), 4)
+
+        # The rolled back checkout never wrote products.stock: this one must
+        self.reserve(product_id, 1)
+        self.assertEqual(cached_stock(product_id), 3)
+
+        self.reserve(product_id, 1)
+        self.assertEqual(cached_stock(product_id), 3)
+
+    def test_shortfall_reports_real_stock_of_sharded_lines(self):
+        short_id = create_product(self.user_id, 'Kettle', 1)
+        sharded_id = create_product(self.user_id, 'Lamp', 12, shards=4)
+
+        basket = BasketRepository.get_or_create_basket(self.user_id, with_items=True)
+        BasketRepository.add_item(basket, short_id, 1)
+        BasketRepository.add_item(basket, sharded_id, 1)
+        ProductRepository.update_product(short_id, stock=0)
+        db.session.commit()
+
+        response = self.client.post('/basket/checkout', headers=self.headers)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.get_json()['errors'], [
+            {'product_id': short_id, 'name': 'Kettle', 'requested': 1, 'available': 0}
+        ])
+        self.assertEqual(sum(shard_stock(sharded_id)), 12)
+
+
+class ShardedCheckoutConcurrencyTest(unittest.TestCase):
+    """Concurrent checkouts on a file database never oversell a sharded product"""
+
+    THREADS = 6
+    ATTEMPTS = 25
+    STOCK = 50
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        stock_shard_repository._last_sync.clear()
+
+        self.app = Flask(__name__)
+        self.app.config.from_object(config['testing'])
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{self.path}'
+        init_db(self.app, check_schema=False)
+        with self.app.app_context():
+            migrate(log=lambda message: None)
+            user = User(username='admin', email='admin@example.com', password_hash='x', role='admin')
+            db.session.add(user)
+            db.session.commit()
+            self.product_id = create_product(user.id, 'Flash sale lamp', self.STOCK, shards=8)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def test_no_oversell(self):
+        results = []
+
+        def worker():
+            for _ in range(self.ATTEMPTS):
+                with self.app.app_context():
+                    while True:
+                        try:
+                            ok, _ = ProductRepository.reserve_stock({self.product_id: 1})
+                            if ok:
+                                db.session.commit()
+                            else:
+                                db.session.rollback()
+                            break
+                        except OperationalError:
+                            # Lost a write race (database locked): retry the attempt
+                            db.session.rollback()
+                    db.session.remove()
+                results.append(ok)
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.app.app_context():
+            self.assertEqual(results.count(True), self.STOCK)
+            self.assertEqual(len(results), self.THREADS * self.ATTEMPTS)
+            self.assertEqual(shard_stock(self.product_id), [0] * 8)
+            self.assertEqual(cached_stock(self.product_id), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
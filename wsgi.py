@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from src.app import create_app
+
+app = create_app(os.getenv('APP_CONFIG', 'production'))